@@ -6,6 +6,10 @@ from pathlib import Path
 import pandas as pd
 import streamlit as st
 
+from columnar_io import read_columnar
+from df_cache import DF_CACHE
+from file_scanner import walk_data_files
+
 st.set_page_config(page_title="Data Editor", layout="wide")
 st.title("📝 DataFrame Editor")
 
@@ -16,6 +20,8 @@ ALLOWED_EXTS = {".xlsx", ".xls", ".csv", ".parquet", ".pq", ".json"}
 # -----------------------------
 def load_df(p: Path) -> pd.DataFrame:
     ext = p.suffix.lower()
+    if p.is_dir():
+        return read_columnar(p)  # partitioned Parquet dataset folder
     if ext in {".parquet", ".pq"}:
         return pd.read_parquet(p)
     if ext in {".csv", ".txt"}:
@@ -50,18 +56,7 @@ def save_df(df: pd.DataFrame, p: Path, fmt: str, sqlite_table: str | None = None
 @st.cache_data(show_spinner=False)
 def scan_files(root_dir: str) -> list[str]:
     """Return sorted list of relative file paths under root that match ALLOWED_EXTS."""
-    root = Path(root_dir).expanduser().resolve()
-    results: list[str] = []
-    if not root.exists():
-        return results
-    for ext in ALLOWED_EXTS:
-        for p in root.rglob(f"*{ext}"):
-            try:
-                rel = p.relative_to(root).as_posix()
-            except Exception:
-                rel = str(p)
-            results.append(rel)
-    return sorted(set(results), key=lambda s: s.lower())
+    return [e.rel for e in walk_data_files(root_dir, ALLOWED_EXTS, workers=8)]
 
 def infer_fmt_from_ext(ext: str) -> str | None:
     ext = ext.lower()
@@ -103,7 +98,7 @@ st.caption(f"Selected: **{selected_path}**")
 # Load
 # -----------------------------
 try:
-    df = load_df(selected_path)
+    df = DF_CACHE.get_or_load(selected_path, load_df)
     st.success(f"Loaded {len(df):,} rows × {df.shape[1]} columns")
 except Exception as e:
     st.error(f"Failed to read {selected_path}: {e}")
@@ -131,6 +126,7 @@ with c1:
                 st.error(f"Unsupported original format: {orig_ext}")
             else:
                 save_df(edited_df, selected_path, same_fmt)
+                DF_CACHE.invalidate(selected_path)
                 st.toast(f"Saved to {selected_path}", icon="✅")
         except Exception as e:
             st.error(f"Save failed: {e}")
@@ -0,0 +1,105 @@
+import os
+import shutil
+import stat
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+
+# Rows per chunk for the streamed text writers (CSV / JSON).
+WRITE_CHUNK_ROWS = 100_000
+
+# Read once at import: os.umask can only be queried by setting it, which is not thread-safe later on.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _target_mode(p: Path) -> int:
+    """Keep an overwritten file's permissions; new files get the usual umask-derived mode, not mkstemp's 0600."""
+    try:
+        return stat.S_IMODE(os.stat(p).st_mode)
+    except OSError:
+        return 0o666 & ~_UMASK
+
+
+def _fsync_dir(d: Path) -> None:
+    """Persist the rename itself; not supported (or needed) on Windows."""
+    try:
+        fd = os.open(d, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_write(p: Path) -> Iterator[Path]:
+    """
+    Yield a temp path in p's directory; on success fsync it and rename it over p.
+
+    The temp name keeps p's suffix so writers that pick an engine from the
+    extension still work. If the body raises, the temp file is removed and p is
+    untouched, so a crash or full disk can never leave a truncated target.
+    """
+    p = Path(p)
+    fd, tmp = tempfile.mkstemp(prefix=f".{p.stem}.", suffix=f".tmp{p.suffix}", dir=p.parent)
+    os.close(fd)
+    tmp = Path(tmp)
+    try:
+        yield tmp
+        with open(tmp, "rb+") as f:
+            os.fsync(f.fileno())
+        os.chmod(tmp, _target_mode(p))
+        os.replace(tmp, p)
+        _fsync_dir(p.parent)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+@contextmanager
+def atomic_directory(p: Path) -> Iterator[Path]:
+    """
+    Yield an empty staging folder beside p; on success swap it in for p (a folder or nothing).
+
+    The old folder is renamed aside before the staging one takes its name, so
+    readers see either the old tree or the complete new one, never a half-written mix.
+    """
+    p = Path(p)
+    if p.exists() and not p.is_dir():
+        raise ValueError(f"{p} exists and is not a folder")
+    staging = Path(tempfile.mkdtemp(prefix=f".{p.name}.", suffix=".tmp.d", dir=p.parent))
+    try:
+        yield staging
+        os.chmod(staging, 0o777 & ~_UMASK)
+        old = None
+        if p.exists():
+            old = Path(tempfile.mkdtemp(prefix=f".{p.name}.", suffix=".old.tmp.d", dir=p.parent))
+            os.replace(p, old / p.name)
+        try:
+            os.replace(staging, p)
+        except OSError:
+            if old is not None:
+                os.replace(old / p.name, p)  # put the previous tree back
+            raise
+        _fsync_dir(p.parent)
+        if old is not None:
+            shutil.rmtree(old, ignore_errors=True)
+    finally:
+        if staging.exists():
+            shutil.rmtree(staging, ignore_errors=True)
+
+
+def iter_slices(df: pd.DataFrame, chunk_rows: int = WRITE_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Row slices of df (views, not copies); an empty frame yields itself once so headers still get written."""
+    if len(df) == 0:
+        yield df
+        return
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
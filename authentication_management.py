@@ -1,8 +1,14 @@
 import pandas as pd
 import pickle 
 from pathlib import Path 
-import sqlite3
 import streamlit_authenticator as stauth 
+from functools import partial
+
+from columnar_io import write_parquet
+from excel_io import write_excel_streaming
+from json_io import write_json_records
+from multi_sink import Sink, write_sinks
+from sqlite_io import write_sqlite
 
 def get_user_list_excel(file_name = "user_list.xlsx"):
     """
@@ -18,9 +24,9 @@ def get_user_list_excel(file_name = "user_list.xlsx"):
         return False
 
 def save_user_list_excel(df, file_name="user_list.xlsx"):
-    """Save DataFrame to Excel file."""
-    df.to_excel(file_name, index=False)
-    print(f"✅ Saved {len(df):,} rows to {file_name}")
+    """Save DataFrame to Excel file (streamed through xlsxwriter's constant_memory mode)."""
+    stats = write_excel_streaming(df, file_name)
+    print(f"✅ Saved {len(df):,} rows to {file_name} ({stats['rows_per_sec']:,.0f} rows/s)")
     return file_name
 
 def save_user_list_parquet(df, file_name="user_list.parquet"):
@@ -29,11 +35,14 @@ def save_user_list_parquet(df, file_name="user_list.parquet"):
     print(f"✅ Saved {len(df):,} rows to {file_name}")
     return file_name
 
+def write_sqlite_table(df, db_file, table_name="user_list"):
+    """Replace one table with a batched bulk load in a single transaction."""
+    return write_sqlite(df, db_file, table_name, mode="replace")
+
 def save_user_list_sqlite(df, db_file="db.sqlite3.db", table_name="user_list"):
     """Save DataFrame to SQLite database table."""
     try:
-        with sqlite3.connect(db_file) as conn:
-            df.to_sql(table_name, conn, if_exists="replace", index=False)
+        write_sqlite_table(df, db_file, table_name)
         print(f"✅ Saved {len(df):,} rows to {db_file} (table: {table_name})")
         return db_file
     except Exception as e:
@@ -64,17 +73,18 @@ def save_user_list_json_array(df, file_name="user_list.json"):
     return file_name
 
 
-def persist_user_list(df):
-    """
-    Save the entire DataFrame as a single JSON array of objects.
+def persist_user_list(df, folder=".", workers=None, skip_unchanged=True):
     """
-    print(save_user_list_excel(df) )    
-    print(save_user_list_parquet(df) )    
-    print(save_user_list_sqlite(df) )       
-    print(save_user_list_json_array(df) )
-    print(f"✅ Saved {len(df):,} rows to everything")
-    return 0
-
-
-
+    Write the user list to Excel, Parquet, SQLite and JSON concurrently.
 
+    Returns a PersistResult with per-sink status and timings; sinks that already
+    hold identical data (same content hash, file untouched) are skipped.
+    """
+    folder = Path(folder)
+    sinks = [
+        Sink("excel", folder / "user_list.xlsx", write_excel_streaming, cpu_bound=True),
+        Sink("parquet", folder / "user_list.parquet", write_parquet),
+        Sink("sqlite", folder / "db.sqlite3.db", partial(write_sqlite_table, table_name="user_list"), key="user_list"),
+        Sink("json", folder / "user_list.json", write_json_records),
+    ]
+    return write_sinks(df, sinks, workers=workers, skip_unchanged=skip_unchanged)
@@ -0,0 +1,136 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+BULK_OPS = ["replace", "fillna", "cast", "trim", "case", "dedupe"]
+CASES = ["lower", "upper", "title"]
+# Targets for "cast"; values that do not convert become missing.
+CAST_TYPES = ["integer", "float", "string", "category", "datetime", "boolean"]
+_TRUE = {"1", "true", "yes", "y", "t"}
+_FALSE = {"0", "false", "no", "n", "f"}
+
+
+class BulkResult(NamedTuple):
+    frame: pd.DataFrame
+    rows: int       # rows with at least one changed cell (or dropped, for dedupe)
+    cells: int      # changed cells (dropped rows for dedupe)
+    lost: int = 0   # values that became missing (cast)
+
+
+def _is_text(s: pd.Series) -> bool:
+    values = s.cat.categories if isinstance(s.dtype, pd.CategoricalDtype) else s
+    return pd.api.types.infer_dtype(values, skipna=True) in {"string", "empty"}
+
+
+def _changed(old: pd.Series, new: pd.Series) -> np.ndarray:
+    """Cells whose value differs (missing on both sides counts as equal)."""
+    both_na = old.isna().to_numpy() & new.isna().to_numpy()
+    eq = (old.astype(object) == new.astype(object)).to_numpy(dtype=bool, na_value=False)
+    return ~(eq | both_na)
+
+
+def _where(old: pd.Series, mask: np.ndarray, new: pd.Series) -> pd.Series:
+    """new on masked rows, old elsewhere; widens to object when the two dtypes cannot mix."""
+    try:
+        return old.mask(mask, new)
+    except (TypeError, ValueError):
+        out = old.astype(object).mask(mask, new.astype(object))
+    # A categorical that gained values (e.g. upper-cased ones) stays categorical.
+    both_categorical = isinstance(old.dtype, pd.CategoricalDtype) and isinstance(new.dtype, pd.CategoricalDtype)
+    return out.astype("category") if both_categorical else out
+
+
+def _cast(s: pd.Series, target: str) -> pd.Series:
+    if target == "integer":
+        num = pd.to_numeric(s, errors="coerce")
+        return num.where(num.round() == num).astype("Int64")  # 2.5 does not become 2
+    if target == "float":
+        return pd.to_numeric(s, errors="coerce").astype("Float64")
+    if target == "string":
+        return s.astype(pd.StringDtype("pyarrow"))
+    if target == "category":
+        return s.astype("category")
+    if target == "datetime":
+        return pd.to_datetime(s, errors="coerce")
+    if target == "boolean":
+        if pd.api.types.is_bool_dtype(s.dtype) or pd.api.types.is_numeric_dtype(s.dtype):
+            return s.astype("boolean")
+        text = s.astype(str).str.strip().str.lower()
+        return pd.Series(pd.NA, index=s.index, dtype="boolean").mask(text.isin(_TRUE), True).mask(text.isin(_FALSE), False)
+    raise ValueError(f"Unknown type: {target!r} (choose from {', '.join(CAST_TYPES)})")
+
+
+def _column_op(s: pd.Series, op: str, params: dict) -> pd.Series:
+    """The whole column with op applied; the caller keeps only the masked rows."""
+    if op in {"replace", "trim", "case"} and not _is_text(s):
+        raise ValueError(f"{op} works on text columns only; {s.name} is {s.dtype}")
+    if op in {"replace", "trim", "case"}:
+        if op == "replace":
+            out = s.str.replace(params["pattern"], params.get("repl", ""), regex=params.get("regex", True),
+                                case=params.get("case", True))
+        elif op == "trim":
+            out = s.str.strip()
+        else:
+            how = params.get("how", "lower")
+            if how not in CASES:
+                raise ValueError(f"Unknown case: {how!r} (choose from {', '.join(CASES)})")
+            out = getattr(s.str, how)()
+        # String methods on a categorical return plain strings; keep the column categorical.
+        return out.astype("category") if isinstance(s.dtype, pd.CategoricalDtype) else out
+    if op == "fillna":
+        value = params["value"]
+        value = value.get(s.name) if isinstance(value, dict) else value  # per-column fill values
+        try:
+            return s.fillna(value)
+        except (TypeError, ValueError):
+            return s.astype(object).fillna(value)
+    raise ValueError(f"Unknown operation: {op!r}")
+
+
+def bulk_edit(df: pd.DataFrame, op: str, columns: list[str], mask: np.ndarray | None = None,
+              **params) -> BulkResult:
+    """
+    df with one vectorized operation applied to columns, on the rows in mask (default all).
+
+    replace (pattern, repl, regex, case), trim and case (how) work on text
+    columns through pandas' string methods - Arrow compute kernels for Arrow
+    strings; fillna takes value (or {column: value}). cast (to, one of CAST_TYPES) changes the
+    whole column's dtype and ignores mask. dedupe drops rows in mask whose
+    columns repeat an earlier (keep="first") or later (keep="last") row's.
+    The result counts what changed, so a preview and a commit are one call.
+    """
+    if not columns:
+        raise ValueError("Pick at least one column.")
+    missing = [c for c in columns if c not in df.columns]
+    if missing:
+        raise ValueError(f"Column(s) not in the data: {', '.join(map(str, missing))}")
+    if op not in BULK_OPS:
+        raise ValueError(f"Unknown operation: {op!r} (choose from {', '.join(BULK_OPS)})")
+    selected = np.ones(len(df), dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+
+    if op == "dedupe":
+        drop = np.zeros(len(df), dtype=bool)
+        drop[selected] = df[selected].duplicated(subset=columns, keep=params.get("keep", "first")).to_numpy()
+        n = int(drop.sum())
+        return BulkResult(df[~drop] if n else df, n, n)
+
+    out, touched, cells, lost = {}, np.zeros(len(df), dtype=bool), 0, 0
+    for col in columns:
+        old = df[col]
+        if op == "cast":
+            new = _cast(old, params["to"])
+            changed = _changed(old, new)
+        else:
+            new = _column_op(old, op, params)
+            changed = _changed(old, new) & selected
+            new = _where(old, changed, new)
+        if changed.any() or op == "cast":
+            out[col] = new
+        touched |= changed
+        cells += int(changed.sum())
+        lost += int(new.isna().sum() - old.isna().sum())
+    frame = df.copy() if out else df
+    for col, new in out.items():
+        frame[col] = new
+    return BulkResult(frame, int(touched.sum()), cells, max(lost, 0))
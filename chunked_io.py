@@ -0,0 +1,162 @@
+import sqlite3
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from columnar_io import open_dataset
+from csv_io import restore_dtypes, sidecar_convert_options
+from excel_io import iter_sheet_rows
+from json_io import JSON_EXTS, iter_ndjson, read_json_fast, sniff_json
+from sqlite_io import SQLITE_EXTS, sqlite_tables
+
+DEFAULT_CHUNK_ROWS = 100_000
+
+
+def _slices(batch: pa.RecordBatch, chunk_rows: int) -> Iterator[pa.RecordBatch]:
+    for start in range(0, batch.num_rows, chunk_rows):
+        yield batch.slice(start, chunk_rows)
+
+
+def _frames(df: pd.DataFrame, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def _iter_csv(p: Path, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """
+    Stream a CSV in chunks of at most chunk_rows rows.
+
+    Arrow fixes column types from the first block; a later block it cannot
+    convert (text in a numeric column) switches the rest of the file to
+    pandas' chunked reader, as iter_ndjson does.
+    """
+    convert, columns = sidecar_convert_options(p)
+    done = 0
+    try:
+        # Arrow's streaming reader holds one block (plus read-ahead) in memory at a time.
+        reader = pacsv.open_csv(p, read_options=pacsv.ReadOptions(use_threads=True, block_size=8 << 20),
+                                convert_options=convert)
+        for batch in reader:
+            for part in _slices(batch, chunk_rows):
+                df = part.to_pandas()
+                done += len(df)
+                yield restore_dtypes(df, columns) if columns else df
+    except pa.ArrowInvalid:
+        with pd.read_csv(p, chunksize=chunk_rows) as reader:
+            for df in reader:
+                if done >= len(df):
+                    done -= len(df)
+                    continue
+                df = df.iloc[done:]
+                done = 0
+                yield restore_dtypes(df, columns) if columns else df
+
+
+def _iter_parquet(p: Path, chunk_rows: int, columns: list[str] | None) -> Iterator[pa.RecordBatch]:
+    with pq.ParquetFile(p) as pf:
+        yield from pf.iter_batches(batch_size=chunk_rows, columns=columns)
+
+
+def _iter_ipc(p: Path, chunk_rows: int, columns: list[str] | None) -> Iterator[pa.RecordBatch]:
+    reader = ipc.open_file(pa.memory_map(str(p), "r"))
+    for i in range(reader.num_record_batches):
+        batch = reader.get_batch(i)
+        if columns:
+            batch = batch.select(columns)
+        yield from _slices(batch, chunk_rows)
+
+
+def _iter_json(p: Path, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    if sniff_json(p) == "ndjson":
+        yield from iter_ndjson(p, chunk_rows)
+    else:
+        # A single JSON array has no record boundaries to stream on; parse once and slice.
+        yield from _frames(read_json_fast(p), chunk_rows)
+
+
+def _iter_sqlite(p: Path, chunk_rows: int, table: str | None, columns: list[str] | None) -> Iterator[pd.DataFrame]:
+    table = table or next(iter(sqlite_tables(p)), None)
+    if table is None:
+        return
+    tbl = '"' + table.replace('"', '""') + '"'
+    cols = ", ".join('"' + c.replace('"', '""') + '"' for c in columns) if columns else "*"
+    with sqlite3.connect(f"file:{Path(p).as_posix()}?mode=ro", uri=True) as conn:
+        try:
+            # Keyset pagination on rowid: each page is an index range seek, not an OFFSET scan.
+            last = None
+            while True:
+                if last is None:
+                    sql, params = f"SELECT rowid AS __rowid, {cols} FROM {tbl} ORDER BY rowid LIMIT ?", (chunk_rows,)
+                else:
+                    sql = f"SELECT rowid AS __rowid, {cols} FROM {tbl} WHERE rowid > ? ORDER BY rowid LIMIT ?"
+                    params = (last, chunk_rows)
+                df = pd.read_sql_query(sql, conn, params=params)
+                if df.empty:
+                    return
+                last = int(df["__rowid"].iloc[-1])
+                yield df.drop(columns="__rowid")
+        except pd.errors.DatabaseError:
+            # WITHOUT ROWID tables: fall back to LIMIT/OFFSET.
+            offset = 0
+            while True:
+                df = pd.read_sql_query(f"SELECT {cols} FROM {tbl} LIMIT ? OFFSET ?", conn, params=(chunk_rows, offset))
+                if df.empty:
+                    return
+                offset += len(df)
+                yield df
+
+
+def _iter_excel(p: Path, chunk_rows: int, sheet_name: str | None) -> Iterator[pd.DataFrame]:
+    if p.suffix.lower() != ".xlsx":
+        yield from _frames(pd.read_excel(p, sheet_name=sheet_name or 0), chunk_rows)  # .xls has no streaming reader
+        return
+    yield from iter_sheet_rows(p, sheet_name, chunk_rows)
+
+
+def iter_df(p: Path, chunk_rows: int = DEFAULT_CHUNK_ROWS, columns: list[str] | None = None,
+            as_arrow: bool = False, sqlite_table: str | None = None,
+            sheet_name: str | None = None) -> Iterator[pd.DataFrame] | Iterator[pa.RecordBatch]:
+    """
+    Stream any file load_df understands as chunks of at most chunk_rows rows.
+
+    Yields DataFrames (or pyarrow RecordBatches with as_arrow=True) so callers
+    can convert, profile or bulk-load arbitrarily large files in constant
+    memory: CSV via Arrow's streaming reader, Parquet row-group batches (also
+    across a partitioned dataset folder), memory-mapped IPC batches, NDJSON
+    lines, SQLite rowid ranges and read-only Excel rows. Pickles and single JSON arrays cannot be streamed
+    and are parsed once, then sliced.
+    """
+    p = Path(p)
+    ext = p.suffix.lower()
+    columns = list(columns) if columns else None
+    if p.is_dir():
+        chunks = open_dataset(p).to_batches(columns=columns, batch_size=chunk_rows)  # partitioned Parquet
+    elif ext in {".parquet", ".pq"}:
+        chunks = _iter_parquet(p, chunk_rows, columns)
+    elif ext in {".feather", ".arrow", ".ipc"}:
+        chunks = _iter_ipc(p, chunk_rows, columns)
+    elif ext in {".csv", ".txt"}:
+        chunks = _iter_csv(p, chunk_rows)
+    elif ext in JSON_EXTS:
+        chunks = _iter_json(p, chunk_rows)
+    elif ext in SQLITE_EXTS:
+        chunks = _iter_sqlite(p, chunk_rows, sqlite_table, columns)
+    elif ext in {".xlsx", ".xls"}:
+        chunks = _iter_excel(p, chunk_rows, sheet_name)
+    elif ext == ".pickle":
+        chunks = _frames(pd.read_pickle(p), chunk_rows)
+    else:
+        raise ValueError(f"Unsupported file type: {ext}")
+
+    for chunk in chunks:
+        if isinstance(chunk, pd.DataFrame) and columns and ext not in SQLITE_EXTS:
+            chunk = chunk[columns]
+        if as_arrow:
+            yield chunk if isinstance(chunk, pa.RecordBatch) else pa.RecordBatch.from_pandas(chunk, preserve_index=False)
+        else:
+            yield chunk.to_pandas() if isinstance(chunk, pa.RecordBatch) else chunk
@@ -0,0 +1,297 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Iterator
+from urllib.parse import quote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from atomic_io import atomic_directory, atomic_write, iter_slices
+
+PARQUET_EXTS = {".parquet", ".pq"}
+IPC_EXTS = {".feather", ".arrow", ".ipc"}
+COLUMNAR_EXTS = PARQUET_EXTS | IPC_EXTS
+
+# Rows per record batch when writing IPC files; batches are the unit of paged reads.
+IPC_BATCH_ROWS = 64 * 1024
+IPC_COMPRESSIONS = ["lz4", "zstd", "uncompressed"]
+PARQUET_CODECS = ["snappy", "zstd", "lz4", "gzip", "brotli", "none"]
+# Row-group size for Parquet written by the editor; small enough to page through one group at a time.
+PARQUET_ROW_GROUP_ROWS = 128 * 1024
+
+# Partitioned dataset output: row cap per part file, writer threads, and the folder name for null keys.
+DATASET_FILE_ROWS = 1_000_000
+DATASET_WORKERS = min(8, os.cpu_count() or 1)
+HIVE_NULL = "__HIVE_DEFAULT_PARTITION__"
+# Schema of the whole frame (partition columns included) written beside the partitions, so folder
+# names parse back to their original types. The "_" prefix keeps it out of file discovery.
+DATASET_SCHEMA_FILE = "_common_metadata"
+_PARTITION_KEY = b"data_editor.partition_cols"
+
+# Operators offered in the sidebar; "between" expands to a >= / <= pair.
+FILTER_OPS = ["==", "!=", "<", "<=", ">", ">=", "in", "not in", "between"]
+
+
+@dataclass(frozen=True)
+class ExportProfile:
+    """Writer settings for Parquet (and the codec for Feather/Arrow IPC) under one name."""
+    description: str
+    compression: str = "snappy"             # Parquet codec, one of PARQUET_CODECS
+    compression_level: int | None = None    # zstd / gzip / brotli only
+    row_group_rows: int = PARQUET_ROW_GROUP_ROWS
+    use_dictionary: bool = True
+    write_statistics: bool = True           # min/max per column chunk, for row-group pruning
+    write_page_index: bool = False          # per-page min/max, for page-level pruning
+    data_page_size: int | None = None       # bytes; smaller pages prune finer
+    ipc_compression: str = "lz4"            # one of IPC_COMPRESSIONS
+    sort_by: tuple[str, ...] = ()           # columns to sort rows by before writing
+
+    def parquet_options(self, schema: pa.Schema) -> dict:
+        """Keyword arguments for pq.ParquetWriter."""
+        options = {
+            "compression": self.compression,
+            "compression_level": self.compression_level if self.compression in {"zstd", "gzip", "brotli"} else None,
+            "use_dictionary": self.use_dictionary,
+            "write_statistics": self.write_statistics,
+            "write_page_index": self.write_page_index,
+        }
+        if self.data_page_size:
+            options["data_page_size"] = self.data_page_size
+        if self.sort_by:
+            options["sorting_columns"] = list(pq.SortingColumn.from_ordering(
+                schema, [(c, "ascending") for c in self.sort_by]))
+        return options
+
+    def ipc_options(self) -> ipc.IpcWriteOptions:
+        if self.ipc_compression in (None, "uncompressed"):
+            return ipc.IpcWriteOptions(compression=None)
+        level = self.compression_level if self.ipc_compression == "zstd" else None
+        return ipc.IpcWriteOptions(compression=pa.Codec(self.ipc_compression, compression_level=level))
+
+
+EXPORT_PROFILES = {
+    "balanced": ExportProfile("Snappy, 128k-row groups, dictionary + statistics. Good default."),
+    "fast-write": ExportProfile(
+        "Cheapest to encode: Snappy, no dictionary or statistics, 1M-row groups; uncompressed IPC.",
+        use_dictionary=False, write_statistics=False, row_group_rows=1024 * 1024, ipc_compression="uncompressed"),
+    "small-file": ExportProfile(
+        "Smallest output: ZSTD level 9, dictionary encoding, 1M-row groups.",
+        compression="zstd", compression_level=9, row_group_rows=1024 * 1024, ipc_compression="zstd"),
+    "fast-scan": ExportProfile(
+        "For query engines: rows sorted by the chosen columns, 128k-row groups, statistics, page index and 256 KiB pages "
+        "so filters skip row groups and pages.",
+        compression="zstd", compression_level=1, write_page_index=True, data_page_size=256 * 1024),
+}
+
+
+def read_schema(p: Path) -> pa.Schema:
+    """Schema from the Parquet footer / IPC header only - no data pages are read."""
+    p = Path(p)
+    if p.is_dir():
+        return open_dataset(p).schema  # partition columns included
+    if p.suffix.lower() in PARQUET_EXTS:
+        return pq.read_schema(p)
+    with pa.memory_map(str(p), "r") as source:
+        return ipc.open_file(source).schema
+
+
+def parse_filter_value(typ: pa.DataType, text: str):
+    """Turn sidebar text into a scalar comparable with a column of Arrow type typ."""
+    text = text.strip()
+    if pa.types.is_integer(typ):
+        return int(text)
+    if pa.types.is_floating(typ) or pa.types.is_decimal(typ):
+        return float(text)
+    if pa.types.is_boolean(typ):
+        return text.lower() in {"1", "true", "yes", "y"}
+    if pa.types.is_timestamp(typ):
+        return pd.Timestamp(text)
+    if pa.types.is_date(typ):
+        return pd.Timestamp(text).date()
+    return text
+
+
+def build_filter(schema: pa.Schema, column: str, op: str, text: str) -> list[tuple]:
+    """One sidebar filter row -> pyarrow/pandas DNF tuples (ANDed by the caller)."""
+    typ = schema.field(column).type
+    if op in {"in", "not in"}:
+        return [(column, op, [parse_filter_value(typ, v) for v in text.split(",") if v.strip()])]
+    if op == "between":
+        lo, hi = text.split(",", 1)
+        return [(column, ">=", parse_filter_value(typ, lo)), (column, "<=", parse_filter_value(typ, hi))]
+    return [(column, op, parse_filter_value(typ, text))]
+
+
+def read_columnar(p: Path, columns: list[str] | None = None, filters: list[tuple] | None = None) -> pd.DataFrame:
+    """
+    Read a Parquet or Feather/Arrow file (or Parquet dataset folder), loading only `columns` and rows matching `filters`.
+
+    Filters are ANDed (col, op, value) tuples. For Parquet they prune whole row
+    groups using the column statistics before any page is decoded; for IPC
+    files they are evaluated batch by batch by the dataset scanner. A Parquet
+    dataset folder is read as one table, and filters on its partition columns
+    skip whole partition folders.
+    """
+    p = Path(p)
+    columns = list(columns) if columns else None
+    if p.is_dir():
+        expr = pq.filters_to_expression(list(filters)) if filters else None
+        return open_dataset(p).to_table(columns=columns, filter=expr).to_pandas()
+    if p.suffix.lower() in PARQUET_EXTS:
+        return pd.read_parquet(p, columns=columns, filters=list(filters) if filters else None)
+    if not filters:
+        return read_ipc_mmap(p, columns=columns)
+    dataset = ds.dataset(p, format="ipc")
+    return dataset.to_table(columns=columns, filter=pq.filters_to_expression(list(filters))).to_pandas()
+
+
+def read_ipc_mmap(p: Path, columns: list[str] | None = None) -> pd.DataFrame:
+    """
+    Memory-map a Feather v2 / Arrow IPC file and wrap it as an Arrow-backed DataFrame.
+
+    For uncompressed files no column data is copied: the ArrowDtype columns point
+    into the mapping, so open time is near-constant and RSS grows only with the
+    pages actually touched. Compressed batches are decompressed on read.
+    """
+    source = pa.memory_map(str(p), "r")  # kept alive by the buffers that reference it
+    table = ipc.open_file(source).read_all()
+    if columns:
+        table = table.select(list(columns))
+    return table.to_pandas(types_mapper=pd.ArrowDtype, self_destruct=False)
+
+
+def _arrow_slices(df: pd.DataFrame, schema: pa.Schema, chunk_rows: int) -> Iterator[pa.Table]:
+    """Convert df to Arrow one slice at a time, so the full-size Arrow copy never exists at once."""
+    for part in iter_slices(df, chunk_rows):
+        yield pa.Table.from_pandas(part, schema=schema, preserve_index=False)
+
+
+def resolve_profile(profile: ExportProfile | str, **overrides) -> ExportProfile:
+    """A profile by name (or as given), with any ExportProfile field overridden, e.g. sort_by=("date",)."""
+    if not isinstance(profile, ExportProfile):
+        try:
+            profile = EXPORT_PROFILES[profile]
+        except KeyError:
+            raise ValueError(f"Unknown export profile: {profile!r} (choose from {', '.join(EXPORT_PROFILES)})") from None
+    if "sort_by" in overrides:
+        overrides["sort_by"] = tuple(overrides["sort_by"] or ())
+    return replace(profile, **overrides) if overrides else profile
+
+
+def _sorted(df: pd.DataFrame, profile: ExportProfile) -> pd.DataFrame:
+    if not profile.sort_by:
+        return df
+    return df.sort_values(list(profile.sort_by), kind="stable", na_position="last", ignore_index=True)
+
+
+def write_parquet(df: pd.DataFrame, p: Path, profile: ExportProfile | str = "balanced", **overrides) -> None:
+    """
+    Write df as Parquet with an export profile (a name from EXPORT_PROFILES or an
+    ExportProfile), optionally overriding fields: write_parquet(df, p, "fast-scan", sort_by=["day"]).
+
+    Rows go through a ParquetWriter one row group at a time, so peak extra memory
+    is one row group's Arrow buffers rather than a second copy of the whole frame.
+    With sort_by set the rows are sorted first and the order is recorded in the
+    footer. The file appears at p only once it is complete.
+    """
+    profile = resolve_profile(profile, **overrides)
+    df = _sorted(df, profile)
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with atomic_write(p) as tmp, pq.ParquetWriter(tmp, schema, **profile.parquet_options(schema)) as writer:
+        for table in _arrow_slices(df, schema, profile.row_group_rows):
+            writer.write_table(table, row_group_size=profile.row_group_rows)
+
+
+def write_ipc(df: pd.DataFrame, p: Path, profile: ExportProfile | str = "balanced", **overrides) -> None:
+    """Write df as an Arrow IPC file (Feather v2) in IPC_BATCH_ROWS batches, compressed per the profile."""
+    profile = resolve_profile(profile, **overrides)
+    df = _sorted(df, profile)
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with atomic_write(p) as tmp, pa.OSFile(str(tmp), "wb") as sink, \
+            ipc.new_file(sink, schema, options=profile.ipc_options()) as writer:
+        for table in _arrow_slices(df, schema, IPC_BATCH_ROWS):
+            writer.write_table(table, max_chunksize=IPC_BATCH_ROWS)
+
+
+def open_dataset(p: Path) -> ds.Dataset:
+    """
+    A Parquet dataset folder with Hive partitioning ("col=value/" folders).
+
+    Datasets written by write_parquet_dataset carry their schema, so partition
+    values parse back to the type they were written from (and pandas dtypes
+    such as Int64 or category survive); others have their types inferred from
+    the folder names.
+    """
+    schema_file = Path(p) / DATASET_SCHEMA_FILE
+    if schema_file.exists():
+        try:
+            schema = pq.read_schema(schema_file)
+            cols = json.loads((schema.metadata or {})[_PARTITION_KEY])
+            fields = [schema.field(c) for c in cols]
+            # Folder names parse as the value type; the dataset schema re-encodes dictionaries.
+            part = pa.schema([f.with_type(f.type.value_type) if pa.types.is_dictionary(f.type) else f
+                              for f in fields])
+            return ds.dataset(p, format="parquet", schema=schema,
+                              partitioning=ds.partitioning(part, flavor="hive"))
+        except (KeyError, ValueError, OSError, pa.ArrowException):
+            pass  # schema file from elsewhere or out of date - infer as for any other dataset
+    return ds.dataset(p, format="parquet", partitioning="hive")
+
+
+def partition_columns(p: Path) -> list[str]:
+    partitioning = open_dataset(p).partitioning
+    return list(partitioning.schema.names) if partitioning is not None else []
+
+
+def _hive_segment(col: str, value) -> str:
+    text = HIVE_NULL if pd.isna(value) else str(value)
+    return f"{col}={quote(text, safe='')}"
+
+
+def write_parquet_dataset(df: pd.DataFrame, p: Path, partition_cols: list[str],
+                          profile: ExportProfile | str = "balanced", max_rows_per_file: int = DATASET_FILE_ROWS,
+                          workers: int = DATASET_WORKERS, **overrides) -> dict:
+    """
+    Write df as a Hive-partitioned Parquet dataset: p/col=value/.../part-00000.parquet.
+
+    Each partition is cut into files of at most max_rows_per_file rows, encoded
+    with the export profile. Partitions are written by a pool of `workers`
+    threads (Arrow encoding releases the GIL); each worker slices its own rows,
+    so at most `workers` partitions are copied out of df at once. The tree is
+    built in a staging folder and swapped in for p when complete. Returns
+    rows, partitions, files and seconds. The frame's schema goes into
+    DATASET_SCHEMA_FILE so open_dataset reads partition values back typed.
+    """
+    if not partition_cols:
+        raise ValueError("Choose at least one partition column.")
+    start = time.perf_counter()
+    profile = resolve_profile(profile, **overrides)
+    # Partition values live in the folder names, not in the files.
+    profile = replace(profile, sort_by=tuple(c for c in profile.sort_by if c not in partition_cols))
+    groups = df.groupby(list(partition_cols), dropna=False, sort=True, observed=True).indices
+
+    def write_partition(item) -> int:
+        key, positions = item
+        key = key if isinstance(key, tuple) else (key,)
+        folder = staging.joinpath(*(_hive_segment(c, v) for c, v in zip(partition_cols, key)))
+        folder.mkdir(parents=True, exist_ok=True)
+        part = df.take(positions).drop(columns=list(partition_cols))
+        files = 0
+        for files, chunk in enumerate(iter_slices(part, max_rows_per_file), start=1):
+            write_parquet(chunk, folder / f"part-{files - 1:05d}.parquet", profile)
+        return files
+
+    with atomic_directory(p) as staging, ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        n_files = sum(pool.map(write_partition, groups.items()))
+        schema = pa.Schema.from_pandas(df, preserve_index=False)
+        schema = schema.with_metadata({**(schema.metadata or {}),
+                                       _PARTITION_KEY: json.dumps(list(partition_cols)).encode()})
+        pq.write_metadata(schema, staging / DATASET_SCHEMA_FILE)
+    return {"rows": len(df), "partitions": len(groups), "files": n_files, "seconds": time.perf_counter() - start}
@@ -0,0 +1,142 @@
+import csv
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+from atomic_io import atomic_write, iter_slices
+
+# <file>.schema.json next to the CSV records the dtypes the frame had when saved.
+SIDECAR_SUFFIX = ".schema.json"
+SCHEMA_VERSION = 1
+_NUMERIC = {"int8", "int16", "int32", "int64", "uint8", "uint16", "uint32", "uint64", "float32", "float64"}
+
+
+def sidecar_path(p: Path) -> Path:
+    p = Path(p)
+    return p.with_name(p.name + SIDECAR_SUFFIX)
+
+
+def describe_dtypes(df: pd.DataFrame) -> dict:
+    """Per-column dtype, categories and datetime format, as stored in the sidecar."""
+    columns = {}
+    for name, dtype in df.dtypes.items():
+        info: dict = {"dtype": str(dtype)}
+        if isinstance(dtype, pd.CategoricalDtype):
+            info["categories"] = [c.item() if hasattr(c, "item") else c for c in dtype.categories]
+            info["ordered"] = bool(dtype.ordered)
+            info["categories_dtype"] = str(dtype.categories.dtype)
+        elif pd.api.types.is_datetime64_any_dtype(dtype):
+            info["format"] = "ISO8601"  # what to_csv emits: YYYY-MM-DD HH:MM:SS[.ffffff][+HH:MM]
+        columns[str(name)] = info
+    return {"version": SCHEMA_VERSION, "columns": columns}
+
+
+def write_sidecar(df: pd.DataFrame, p: Path) -> Path:
+    out = sidecar_path(p)
+    with atomic_write(out) as tmp:
+        tmp.write_text(json.dumps(describe_dtypes(df), indent=2, default=str), encoding="utf-8")
+    return out
+
+
+def read_sidecar(p: Path) -> dict | None:
+    path = sidecar_path(p)
+    if not path.exists():
+        return None
+    try:
+        schema = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return schema if schema.get("version") == SCHEMA_VERSION else None
+
+
+def _arrow_type(info: dict) -> pa.DataType | None:
+    """Arrow type to parse a column as, or None to let Arrow infer it."""
+    dtype = info["dtype"]
+    if dtype == "category":
+        return pa.string() if info.get("categories_dtype", "object") in {"object", "str", "string"} else None
+    if dtype in {"object", "str", "string"} or dtype.startswith("string"):
+        return pa.string()
+    if dtype.startswith("datetime64["):
+        unit, _, tz = dtype[len("datetime64["):-1].partition(",")
+        return pa.timestamp(unit.strip(), tz=tz.strip() or None)
+    if dtype in {"bool", "boolean"}:
+        return pa.bool_()
+    if dtype.lower() in _NUMERIC:  # Int64 / Float64 parse like their numpy counterparts
+        return pa.from_numpy_dtype(np.dtype(dtype.lower()))
+    return None
+
+
+def restore_dtypes(df: pd.DataFrame, columns: dict) -> pd.DataFrame:
+    for name, info in columns.items():
+        if name not in df.columns:
+            continue
+        try:
+            if info["dtype"] == "category":
+                categories = pd.Index(info.get("categories") or [])
+                # Values added to the CSV since it was saved would otherwise load as NaN.
+                unseen = pd.Index(df[name].dropna().unique()).difference(categories, sort=False)
+                df[name] = df[name].astype(pd.CategoricalDtype(categories.append(unseen),
+                                                               ordered=info.get("ordered", False)))
+            elif str(df[name].dtype) != info["dtype"]:
+                df[name] = df[name].astype(info["dtype"])
+        except (TypeError, ValueError):
+            pass  # leave the parsed dtype rather than fail the load
+    return df
+
+
+def sidecar_convert_options(p: Path) -> tuple[pacsv.ConvertOptions, dict | None]:
+    """ConvertOptions typed from a sidecar whose columns match the CSV header, plus its column info."""
+    convert = dict(strings_can_be_null=True)  # empty string -> NaN, like pd.read_csv
+    schema = read_sidecar(p)
+    if schema:
+        with open(p, newline="", encoding="utf-8") as f:
+            header = next(csv.reader(f), [])
+        if header == list(schema["columns"]):
+            types = {n: t for n, info in schema["columns"].items() if (t := _arrow_type(info)) is not None}
+            parsers = sorted({info["format"] for info in schema["columns"].values()
+                              if info.get("format") and info["format"] != "ISO8601"})
+            return pacsv.ConvertOptions(column_types=types, timestamp_parsers=parsers + [pacsv.ISO8601],
+                                        **convert), schema["columns"]
+    return pacsv.ConvertOptions(**convert), None
+
+
+def read_csv_fast(p: Path) -> pd.DataFrame:
+    """
+    Multithreaded pyarrow CSV parse, typed from the sidecar schema when one matches.
+
+    With a sidecar, every listed column is parsed with an explicit type (no
+    inference pass) and converted back to the exact pandas dtype it was saved
+    with. A missing, stale (different header) or violated sidecar falls back
+    to plain inference.
+    """
+    p = Path(p)
+    read_opts = pacsv.ReadOptions(use_threads=True, block_size=16 << 20)
+    convert, columns = sidecar_convert_options(p)
+    if columns:
+        try:
+            table = pacsv.read_csv(p, read_options=read_opts, convert_options=convert)
+            return restore_dtypes(table.to_pandas(), columns)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            convert = pacsv.ConvertOptions(strings_can_be_null=True)  # file was edited outside the app - re-infer
+    try:
+        table = pacsv.read_csv(p, read_options=read_opts, convert_options=convert)
+    except pa.ArrowInvalid:
+        return pd.read_csv(p)  # ragged rows, odd quoting... the C engine is more forgiving
+    return table.to_pandas()
+
+
+def write_csv_with_schema(df: pd.DataFrame, p: Path) -> None:
+    """
+    df.to_csv plus the <file>.schema.json sidecar that makes the next load exact.
+
+    Rows are formatted WRITE_CHUNK_ROWS at a time into a temp file that replaces
+    p only when complete, so the formatted text never sits in memory whole.
+    """
+    with atomic_write(p) as tmp, open(tmp, "w", newline="", encoding="utf-8") as f:
+        for i, part in enumerate(iter_slices(df)):
+            part.to_csv(f, header=i == 0, index=False)
+    write_sidecar(df, p)
@@ -1,74 +1,144 @@
 
 import os
 import sys
-import sqlite3
+import threading
+from functools import partial
 from pathlib import Path
 import pandas as pd
+import pyarrow as pa
 import streamlit as st
 
+from atomic_io import atomic_write
+from bulk_ops import BULK_OPS, CASES, CAST_TYPES, bulk_edit
+from columnar_io import (COLUMNAR_EXTS, DATASET_FILE_ROWS, EXPORT_PROFILES, FILTER_OPS, IPC_COMPRESSIONS,
+                         PARQUET_CODECS, ExportProfile, build_filter, parse_filter_value, partition_columns,
+                         read_columnar, read_schema, resolve_profile, write_ipc, write_parquet, write_parquet_dataset)
+from csv_io import read_csv_fast, write_csv_with_schema
+from df_cache import DF_CACHE, file_signature
+from dtype_compact import compact_frame, compaction_report, restore_dtypes_lossless
+from edit_delta import apply_delta_parquet, apply_delta_sqlite, compute_delta, index_is_row_positions
+from excel_io import EXCEL_ENGINES, EXCEL_EXTS, list_sheets, read_sheet, replace_sheet, write_excel_streaming
+from file_catalog import FileCatalog
+from file_scanner import DEFAULT_SKIP_DIRS
+from json_io import JSON_EXTS, read_json_fast, write_json_records, write_ndjson
+from paged_editor import PAGED_EXTS, PAGED_SAVE_FORMATS, PageOverlay, PagedTable, SharedTable, save_paged
+from render_budget import RENDER_BUDGET_BYTES, TRUNCATE_CHARS, merge_back, plan_render
+from sample_edit import (RULE_KINDS, SAMPLE_METHODS, SAMPLE_ROWS, STREAM_FORMATS, EditRule, apply_rules_streaming,
+                         filter_mask, load_sample, rules_from_edits)
+from sql_query import GLOB_VIEW, HAS_DUCKDB, SOURCE_VIEW, count_rows, export_query, query_page
+from sqlite_io import SQLITE_EXTS, SQLITE_MODES, SqliteTable, db_signature, sqlite_tables, write_sqlite
+
 # ---------- Page setup ----------
 st.set_page_config(page_title="Data Editor (Sidebar Controls)", layout="wide")
 
 # Title stays above the editor; all controls go to the sidebar.
 st.title("📝 DataFrame Editor v1.2")
 
-ALLOWED_EXTS = {".xlsx", ".xls", ".csv", ".parquet", ".pq", ".json", ".feather", ".pickle"} 
+ALLOWED_EXTS = {".xlsx", ".xls", ".csv", ".parquet", ".pq", ".json", ".jsonl", ".ndjson", ".feather", ".arrow", ".ipc",
+                ".pickle"} | SQLITE_EXTS
+PAGED_AUTO_BYTES = 256 * 1024 * 1024  # columnar files above this open in paged mode by default
 
 # ---------- Helpers ----------
-def load_df(p: Path) -> pd.DataFrame:
+def load_df(p: Path, columns: tuple[str, ...] | None = None, filters: tuple[tuple, ...] | None = None,
+            sheet: str | None = None, excel_engine: str = "auto", progress=None) -> pd.DataFrame:
     ext = p.suffix.lower()
-    if ext in {".parquet", ".pq"}:
-        return pd.read_parquet(p)
+    if ext in COLUMNAR_EXTS or p.is_dir():
+        # Projection + predicate pushdown: only the selected columns / matching row groups (or
+        # partition folders of a dataset) are read.
+        return read_columnar(p, columns=columns, filters=filters)
     if ext in {".csv", ".txt"}:
-        return pd.read_csv(p)
-    if ext in {".xlsx", ".xls"}:
-        return pd.read_excel(p)
+        # Multithreaded pyarrow parse; dtypes come from <file>.schema.json when present.
+        return read_csv_fast(p)
+    if ext in EXCEL_EXTS:
+        return read_sheet(p, sheet_name=sheet, engine=excel_engine, progress=progress)
     if ext in {".pickle"}:
         return pd.read_pickle(p)        
-    if ext == ".json":
-        # Try JSON Lines first, then array
-        try:
-            return pd.read_json(p, lines=True)
-        except ValueError:
-            return pd.read_json(p)
+    if ext in JSON_EXTS:
+        # Array vs JSON Lines is sniffed from the first bytes, so the file is parsed once.
+        return read_json_fast(p)
     raise ValueError(f"Unsupported file type: {ext}")
 
-def save_df(df: pd.DataFrame, p: Path, fmt: str, sqlite_table: str | None = None):
+def load_compact(p: Path, loader=load_df, **options) -> pd.DataFrame:
+    """loader's frame with every column in its smallest lossless dtype (before/after sizes in attrs)."""
+    return compact_frame(loader(p, **options))
+
+def save_df(df: pd.DataFrame, p: Path, fmt: str, sqlite_table: str | None = None,
+            profile: ExportProfile | str = "balanced", partition_cols: list[str] | None = None,
+            max_rows_per_file: int = DATASET_FILE_ROWS, sqlite_mode: str = "replace",
+            sqlite_key: list[str] | None = None, sqlite_indexes: list[str] = ()):
+    """Every format is written to a temp file beside p and renamed over it only once complete."""
+    if fmt == "parquet_dataset":
+        return write_parquet_dataset(df, p, partition_cols, profile, max_rows_per_file=max_rows_per_file)
     if fmt == "csv":
-        df.to_csv(p, index=False)
+        write_csv_with_schema(df, p)
     elif fmt == "parquet":
-        df.to_parquet(p, index=False)
+        write_parquet(df, p, profile)
     elif fmt == "excel":
-        df.to_excel(p, index=False)
-    elif fmt == "feather":
-        df.to_feather(p)   
+        return write_excel_streaming(df, p)  # constant-memory xlsxwriter; returns throughput stats
+    elif fmt in {"feather", "arrow"}:
+        write_ipc(df, p, profile)
     elif fmt == "pickle":
-        df.to_pickle(p)                
+        with atomic_write(p) as tmp:
+            df.to_pickle(tmp)
     elif fmt == "json":
-        df.to_json(p, orient="records", indent=2, date_format="iso", force_ascii=False)
+        write_json_records(df, p)
+    elif fmt == "ndjson":
+        write_ndjson(df, p)
     elif fmt == "sqlite":
         if not sqlite_table:
             raise ValueError("Please provide a SQLite table name.")
-        with sqlite3.connect(p) as conn:
-            df.to_sql(sqlite_table, conn, if_exists="replace", index=False)
+        # SQLite is crash-safe through its journal; the whole load is one transaction.
+        return write_sqlite(df, p, sqlite_table, mode=sqlite_mode, key=sqlite_key, indexes=sqlite_indexes)
     else:
         raise ValueError(f"Unknown format: {fmt}")
 
-@st.cache_data(show_spinner=False)
-def scan_files(root_dir: str) -> list[str]:
-    """Return sorted list of relative file paths under root that match ALLOWED_EXTS."""
-    root = Path(root_dir).expanduser().resolve()
-    results: list[str] = []
-    if not root.exists():
-        return results
-    for ext in ALLOWED_EXTS:
-        for p in root.rglob(f"*{ext}"):
-            try:
-                rel = p.relative_to(root).as_posix()
-            except Exception:
-                rel = str(p)
-            results.append(rel)
-    return sorted(set(results), key=lambda s: s.lower())
+@st.cache_resource(show_spinner="Indexing data files…")
+def get_catalog(root_dir: str, max_depth: int | None, skip_dirs: tuple[str, ...]) -> FileCatalog:
+    """One persistent catalog (+ background watcher) per search root, shared by all sessions."""
+    catalog = FileCatalog(root_dir, ALLOWED_EXTS, skip_dirs=skip_dirs, max_depth=max_depth)
+    if catalog.is_empty():
+        catalog.refresh()
+    else:
+        # Serve the stored listing right away; catch up on changes made while the app was down.
+        threading.Thread(target=catalog.refresh, name="catalog-refresh", daemon=True).start()
+    catalog.start_watcher()
+    return catalog
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def open_paged_table(path: str, mtime_ns: int) -> PagedTable:
+    """Footer/metadata-only open; mtime_ns in the key reopens the file after it is rewritten."""
+    return PagedTable(Path(path))
+
+@st.cache_resource(show_spinner="Loading shared copy…", max_entries=4)
+def open_shared_table(path: str, signature: tuple, sheet: str | None = None, excel_engine: str = "auto") -> SharedTable:
+    """One immutable Arrow copy per file version for all sessions; each session keeps only its PageOverlay."""
+    p = Path(path)
+    table = pa.Table.from_pandas(load_df(p, sheet=sheet, excel_engine=excel_engine), preserve_index=False)
+    return SharedTable(table, p)
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def open_sqlite_table(path: str, table: str, signature: tuple[int, int, int]) -> SqliteTable:
+    """Schema + COUNT(*) only; any commit to the database (main file or WAL) changes the signature."""
+    return SqliteTable(Path(path), table)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def database_tables(path: str, signature: tuple[int, int, int]) -> list[str]:
+    return sqlite_tables(Path(path))
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def columnar_schema(path: str, mtime_ns: int):
+    return read_schema(Path(path))
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def workbook_sheets(path: str, mtime_ns: int):
+    return list_sheets(Path(path))
+
+def human_size(n: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024:
+            return f"{n:,.0f} {unit}"
+        n /= 1024
+    return f"{n:,.1f} TB"
 
 def infer_fmt_from_ext(ext: str) -> str | None:
     ext = ext.lower()
@@ -80,26 +150,35 @@ def infer_fmt_from_ext(ext: str) -> str | None:
         return "excel"
     if ext in {".feather", ".ft"}:
         return "feather"        
+    if ext in {".arrow", ".ipc"}:
+        return "arrow"
     if ext in {".pickle", ".pkl"}:
         return "pickle"            
     if ext == ".json":
         return "json"
+    if ext in {".jsonl", ".ndjson"}:
+        return "ndjson"
+    if ext in SQLITE_EXTS:
+        return "sqlite"
     return None
 
 def ext_for(fmt_label: str) -> str:
     if fmt_label.startswith("CSV"): return ".csv"
     if fmt_label.startswith("Parquet"): return ".parquet"
     if fmt_label.startswith("Feather"): return ".feather"        
+    if fmt_label.startswith("Arrow"): return ".arrow"
     if fmt_label.startswith("Pickle"): return ".pickle"    
     if fmt_label.startswith("Excel"): return ".xlsx"
+    if fmt_label.startswith("JSON Lines"): return ".jsonl"
     if fmt_label.startswith("JSON"): return ".json"
     if fmt_label.startswith("SQLite"): return ".db"
     return ""
 
-# ===========================
-#        SIDEBAR UI
-# ===========================
-with st.sidebar:
+# ---------- Fragments ----------
+# Widgets inside a fragment rerun only that fragment, so typing in one panel does not rescan,
+# reload or re-send the data grid. Panels hand values to each other through st.session_state.
+@st.fragment
+def branding() -> None:
     # --- Logo area (leave space even if not used) ---
     st.markdown("### 🌟 App Branding")
     logo_path = st.text_input("Logo file path or URL (optional)", value="", help="PNG/JPG/GIF; leave blank to skip.")
@@ -109,7 +188,13 @@ with st.sidebar:
         except Exception:
             st.info("Could not load logo. Check the path/URL.")
 
-    st.markdown("---")
+@st.fragment
+def file_browser() -> None:
+    """Root, filter and file picker; publishes the selection as session_state["browser"].
+
+    Filtering and rescanning stay inside the fragment. Picking another file (or
+    root) reruns the whole app so the new data is loaded.
+    """
     st.markdown("### 🔎 File Browser")
 
     default_root = str(Path.cwd())
@@ -117,50 +202,549 @@ with st.sidebar:
     rescan = st.button("🔄 Rescan files", key="rescan")
     name_filter = st.text_input("Filename filter (contains)", value="")
 
+    with st.expander("Scan options", expanded=False):
+        depth_limit = st.number_input("Max folder depth (0 = unlimited)", min_value=0, value=0, step=1, key="scan_depth")
+        skip_text = st.text_input("Skip folders named", value=", ".join(sorted(DEFAULT_SKIP_DIRS)), key="scan_skip")
+    skip_dirs = tuple(sorted({d.strip() for d in skip_text.split(",") if d.strip()}))
+
+    if not Path(root_dir).expanduser().is_dir():
+        st.info(f"Search root not found: {root_dir}")
+        st.stop()
+    root = str(Path(root_dir).expanduser().resolve())
+    catalog = get_catalog(root, depth_limit or None, skip_dirs)
     if rescan:
-        scan_files.clear()  # clear cache
+        changes = catalog.refresh()
+        st.caption(f"Rescanned: +{changes['added']} / ~{changes['updated']} / -{changes['removed']}")
 
-    file_list = scan_files(root_dir)
-    if name_filter.strip():
-        q = name_filter.strip().lower()
-        file_list = [f for f in file_list if q in f.lower()]
+    entries = catalog.search(name_filter)
+    sizes = {e.rel: e.size for e in entries}
+    file_list = list(sizes)
 
     if not file_list:
         st.info("No data files found.\nSupported: .xlsx, .csv, .parquet, .pq, .json")
         st.stop()
 
-    selected_rel = st.selectbox("Select a file (relative to root)", options=file_list, index=0, key="file_select")
-    selected_path = Path(root_dir).expanduser().resolve() / selected_rel
-    st.caption(f"Selected: **{selected_path}**")
+    selected_rel = st.selectbox("Select a file (relative to root)", options=file_list, index=0, key="file_select",
+                                format_func=lambda f: f"{f}  ({human_size(sizes[f])})")
+    shape = catalog.shape(selected_rel)
+    st.caption(f"Selected: **{Path(root) / selected_rel}**" + (f" · {shape[0]:,} × {shape[1]}" if shape else ""))
+
+    selection = {"root": root, "max_depth": depth_limit or None, "skip_dirs": skip_dirs,
+                 "rel": selected_rel, "size": sizes[selected_rel]}
+    previous = st.session_state.get("browser")
+    st.session_state["browser"] = selection
+    # A save changes the file's size in the catalog; only a different file needs the app rerun.
+    if previous is not None and {**previous, "size": None} != {**selection, "size": None}:
+        st.rerun()
+
+# ===========================
+#        SIDEBAR UI
+# ===========================
+with st.sidebar:
+    branding()
+    st.markdown("---")
+    file_browser()
+    browser = st.session_state["browser"]
+    catalog = get_catalog(browser["root"], browser["max_depth"], browser["skip_dirs"])
+    selected_rel = browser["rel"]
+    selected_path = Path(browser["root"]) / selected_rel
+
+    is_dataset = selected_path.is_dir()  # partitioned Parquet folder
+    is_sqlite = selected_path.suffix.lower() in SQLITE_EXTS
+    paged_mode, sample_mode, db_table = False, False, None
+    if is_sqlite:
+        try:
+            tables = database_tables(str(selected_path), db_signature(selected_path))
+        except Exception as e:
+            st.error(f"Could not open database: {e}")
+            st.stop()
+        if not tables:
+            st.info("This database has no tables.")
+            st.stop()
+        db_table = st.selectbox("Table", tables, key=f"table_{selected_rel}")
+        # Tables are always paged: rows are read on demand and edits go back as targeted UPDATEs.
+        paged_mode = True
+        page_size = int(st.number_input("Rows per page", min_value=100, max_value=100_000, value=5_000,
+                                        step=1_000, key="page_size"))
+    else:
+        # Parquet/Feather pages come straight from disk; other formats page through one shared in-memory copy.
+        # Only offered where save_paged can stream the file back (not pickle or dataset folders).
+        on_disk = selected_path.suffix.lower() in PAGED_EXTS and not is_dataset
+        pageable = on_disk or (not is_dataset
+                               and infer_fmt_from_ext(selected_path.suffix) in PAGED_SAVE_FORMATS)
+        paged_mode = pageable and st.toggle(
+            "Paged mode (large files)", value=browser["size"] > PAGED_AUTO_BYTES, key=f"paged_{selected_rel}",
+            help="Reads only the rows on screen; edits are merged into the file on save."
+                 if on_disk else "Every session shares one read-only copy of the file and "
+                 "keeps only its own edits, which are merged into the file on save.")
+        if paged_mode:
+            page_size = int(st.number_input("Rows per page", min_value=100, max_value=100_000, value=5_000,
+                                            step=1_000, key="page_size"))
+        else:
+            sample_mode = st.toggle("Sample, then apply to the whole file", key=f"sample_{selected_rel}",
+                                    help="Edit a random sample; edits become rules that are applied to every "
+                                         "row in one streaming pass on save.")
+        if sample_mode:
+            sample_rows = int(st.number_input("Sample rows", min_value=100, max_value=200_000, value=SAMPLE_ROWS,
+                                              step=1_000, key="sample_rows"))
+            method_labels = {"uniform": "Uniform (one pass over the file)",
+                             "row_groups": "Row groups (Parquet, reads only the sampled groups)",
+                             "stratified": "Stratified (rows shared evenly over a column's values)"}
+            sample_method = st.selectbox("Sampling", SAMPLE_METHODS, format_func=method_labels.get,
+                                         key="sample_method")
+            sample_strata = (st.text_input("Stratify by column", key="sample_strata")
+                             if sample_method == "stratified" else None)
+
+    load_columns, load_filters, partial_load = None, None, False
+    sheet, sheets, excel_engine = None, [], "auto"
+    if selected_path.suffix.lower() in EXCEL_EXTS:
+        try:
+            sheets = workbook_sheets(str(selected_path), selected_path.stat().st_mtime_ns)
+        except Exception as e:
+            st.warning(f"Could not list sheets: {e}")
+        if sheets:
+            dims = {s.name: (f"  ({s.n_rows - 1:,} rows × {s.n_cols})" if s.n_rows else "") for s in sheets}
+            sheet = st.selectbox("Sheet", [s.name for s in sheets], key=f"sheet_{selected_rel}",
+                                 format_func=lambda name: name + dims[name])
+        excel_engine = st.selectbox("Excel reader", EXCEL_ENGINES, key="excel_engine",
+                                    help="calamine is fastest; openpyxl streams read-only with progress.")
+    compact_load = False
+    if not paged_mode and not sample_mode:
+        compact_load = st.toggle("Compact dtypes", key="compact_load",
+                                 help="Narrowest lossless numeric types, category for repetitive text, Arrow "
+                                      "strings otherwise. Dtypes are kept on save (Parquet, Feather, CSV sidecar).")
+    if (selected_path.suffix.lower() in COLUMNAR_EXTS or is_dataset) and not paged_mode and not sample_mode:
+        with st.expander("Load only… (columns / row filters)", expanded=False):
+            try:
+                schema = columnar_schema(str(selected_path), file_signature(selected_path)[2])
+                picked = st.multiselect("Columns to load (empty = all)", schema.names, key=f"cols_{selected_rel}")
+                n_filters = int(st.number_input("Row filters", min_value=0, max_value=5, value=0, key="n_filters"))
+                filters: list[tuple] = []
+                for i in range(n_filters):
+                    fc1, fc2, fc3 = st.columns([2, 1, 2])
+                    f_col = fc1.selectbox("Column", schema.names, key=f"f_col_{i}", label_visibility="collapsed")
+                    f_op = fc2.selectbox("Op", FILTER_OPS, key=f"f_op_{i}", label_visibility="collapsed")
+                    f_val = fc3.text_input("Value", key=f"f_val_{i}", label_visibility="collapsed",
+                                           placeholder="a,b for in / between")
+                    if f_val.strip():
+                        filters.extend(build_filter(schema, f_col, f_op, f_val))
+                load_columns = tuple(picked) or None
+                load_filters = tuple(filters) or None
+            except Exception as e:
+                st.warning(f"Ignoring load options: {e}")
+                load_columns, load_filters = None, None
+
+    query_mode = False
+    with st.expander("🦆 SQL query (DuckDB)", expanded=False):
+        if not HAS_DUCKDB:
+            st.caption("Install duckdb to query files with SQL.")
+        else:
+            st.caption(f"`{SOURCE_VIEW}` is the selected {'table (the database is attached as `db`)' if is_sqlite else 'file'}"
+                       f"; `{GLOB_VIEW}` is every file matching the pattern below.")
+            sql_glob = st.text_input("Files matching (relative to the search root)", value="", key="sql_glob",
+                                     placeholder="**/*.parquet")
+            sql_text = st.text_area("Query", value=f"SELECT * FROM {SOURCE_VIEW}", key="sql_text", height=120)
+            query_mode = st.toggle("Edit the query result", key="sql_on",
+                                   help="Filters, joins and aggregates run in DuckDB, out-of-core and on all cores; "
+                                        "the editor gets one page of the result at a time.")
+            if query_mode:
+                query_page_size = int(st.number_input("Result rows per page", min_value=100, max_value=100_000,
+                                                      value=5_000, step=1_000, key="sql_page_size"))
+                rerun_query = st.button("▶ Run again", key="sql_run", help="Re-reads files changed since the last run.")
+    if query_mode:
+        paged_mode = sample_mode = False
+        query_sources = dict(source=selected_path, sqlite_table=db_table, pattern=sql_glob,
+                             root=Path(browser["root"]))
 
 # ---------- Load selected file ----------
-try:
-    df = load_df(selected_path)
-    st.success(f"Loaded {len(df):,} rows × {df.shape[1]} columns")
-except Exception as e:
-    st.error(f"Failed to read {selected_path}: {e}")
-    st.stop()
+if query_mode:
+    try:
+        version = db_signature(selected_path) if is_sqlite else file_signature(selected_path)[2]
+        query_key = (sql_text, sql_glob, str(selected_path), db_table, version)
+        # The count and each page are kept until the query, its inputs or the page change.
+        if rerun_query or st.session_state.get("query_rows", (None,))[0] != query_key:
+            st.session_state["query_rows"] = (query_key, count_rows(sql_text, **query_sources))
+            st.session_state.pop("query_base", None)
+        n_result = st.session_state["query_rows"][1]
+        n_pages = max(1, -(-n_result // query_page_size))
+        page_no = int(st.number_input(f"Result page (of {n_pages:,})", min_value=1, max_value=n_pages, value=1,
+                                      key="sql_page_no")) - 1
+        page_key = (query_key, page_no, query_page_size)
+        if st.session_state.get("query_base", (None,))[0] != page_key:
+            st.session_state["query_base"] = (page_key, query_page(sql_text, page_no, query_page_size,
+                                                                   **query_sources))
+        df = st.session_state["query_base"][1]
+        data_key = page_key
+    except Exception as e:
+        st.error(f"Query failed: {e}")
+        st.stop()
+    partial_load = True
+    first_row = page_no * query_page_size
+    st.success(f"Query returned {n_result:,} rows × {df.shape[1]} columns · showing rows "
+               f"{first_row:,}–{first_row + max(len(df), 1) - 1:,}")
+elif paged_mode:
+    try:
+        if is_sqlite:
+            version = db_signature(selected_path)
+            table = open_sqlite_table(str(selected_path), db_table, version)
+        elif on_disk:
+            version = selected_path.stat().st_mtime_ns
+            table = open_paged_table(str(selected_path), version)
+        else:
+            version = file_signature(selected_path)
+            table = open_shared_table(str(selected_path), version, sheet, excel_engine)
+    except Exception as e:
+        st.error(f"Failed to open {selected_path}: {e}")
+        st.stop()
+    source_key = f"{selected_path}::{db_table}" if is_sqlite else str(selected_path)
+    overlay = st.session_state.setdefault("page_overlays", {}).setdefault(source_key, PageOverlay())
+    n_pages = table.num_pages(page_size)
+    page_no = int(st.number_input(f"Page (of {n_pages:,})", min_value=1, max_value=n_pages, value=1,
+                                  key="page_no")) - 1
+    raw_page = table.page(page_no, page_size)
+    # Keep the editor's input fixed while the page is open so in-progress edits are not reset.
+    page_key = (source_key, version, page_no, page_size)
+    if st.session_state.get("paged_base", (None,))[0] != page_key:
+        st.session_state["paged_base"] = (page_key, overlay.apply(raw_page))
+    df = st.session_state["paged_base"][1]
+    data_key = page_key
+    n_cols = len(table.columns) if is_sqlite else len(table.schema)
+    first_row = page_no * page_size
+    st.success(f"{table.num_rows:,} rows × {n_cols} columns · showing rows "
+               f"{first_row:,}–{first_row + max(len(raw_page), 1) - 1:,}")
+    if is_sqlite and not table.editable:
+        st.info("This table has a composite primary key and no rowid, so it opens read-only.")
+elif sample_mode:
+    try:
+        sample_version = file_signature(selected_path)[2]
+        data_key = (str(selected_path), sample_version, sample_rows, sample_method, sample_strata, sheet)
+        df = DF_CACHE.get_or_load(selected_path, load_sample, n_rows=sample_rows, method=sample_method,
+                                  strata=sample_strata or None, sheet_name=sheet)
+    except Exception as e:
+        st.error(f"Failed to sample {selected_path}: {e}")
+        st.stop()
+    partial_load = True
+    st.success(f"Sampled {len(df):,} rows × {df.shape[1]} columns · edits become rules applied to the whole "
+               f"file on save")
+else:
+    try:
+        # Served from the process-wide cache unless the file changed since it was parsed.
+        loader, options = load_df, dict(columns=load_columns, filters=load_filters)
+        if sheet is not None:
+            # Cached per (file, sheet, mtime); the progress bar is not part of the cache key.
+            bar = st.empty()
+            loader = partial(load_df, progress=lambda f: bar.progress(f, text=f"Reading sheet {sheet}…"))
+            options.update(sheet=sheet, excel_engine=excel_engine)
+        if compact_load:
+            # The loader is part of the cache key, so switching the toggle never serves the other variant.
+            loader = partial(load_compact, loader=loader)
+        data_key = (file_signature(selected_path), compact_load, options)
+        df = DF_CACHE.get_or_load(selected_path, loader, **options)
+        if sheet is not None:
+            bar.empty()
+        partial_load = bool(load_columns or load_filters)
+        if partial_load:
+            st.success(f"Loaded {len(df):,} rows × {df.shape[1]} columns (subset of the file)")
+        else:
+            catalog.set_shape(selected_rel, len(df), df.shape[1])
+            st.success(f"Loaded {len(df):,} rows × {df.shape[1]} columns")
+    except Exception as e:
+        st.error(f"Failed to read {selected_path}: {e}")
+        st.stop()
+    report = compaction_report(df) if compact_load else None
+    if report is not None:
+        before, after = int(report["before_bytes"].sum()), int(report["after_bytes"].sum())
+        with st.expander(f"Compact dtypes: {human_size(before)} → {human_size(after)} in memory "
+                         f"({before / max(after, 1):.1f}× smaller)", expanded=False):
+            st.dataframe(pd.DataFrame({
+                "dtype before": report["before"], "dtype after": report["after"],
+                "memory before": report["before_bytes"].map(human_size),
+                "memory after": report["after_bytes"].map(human_size),
+                "saved": report["saved"].map("{:.0%}".format),
+            }), use_container_width=True)
 
 # ===========================
 #       MAIN: EDITOR
 # ===========================
-edited_df = st.data_editor(
-    df,
-    num_rows="dynamic",
-    use_container_width=True,
-    key="editor"
-)
+@st.fragment
+def editor_panel() -> None:
+    """The grid; a cell edit reruns only this fragment and publishes session_state["edited_df"]."""
+    # A committed bulk edit replaces the grid's input until other data is loaded. It is keyed on the
+    # source (file version and load options, or the page), not on df itself: an uncached or evicted
+    # frame is a new object on every run.
+    bulk = st.session_state.get("bulk_base")
+    base, bulk_version = (bulk[1], bulk[2]) if bulk is not None and bulk[0] == data_key else (df, 0)
+    with st.expander("🖼️ Display: hide columns, truncate long text", expanded=False):
+        hidden = st.multiselect("Hide columns", list(df.columns),
+                                key=f"hide_cols_{selected_rel}_{db_table or ''}{'_sql' if query_mode else ''}")
+        max_chars = int(st.number_input("Truncate text longer than (characters, 0 = off)", min_value=0,
+                                        value=TRUNCATE_CHARS, step=50, key="truncate_chars"))
+        budget_mb = int(st.number_input("Grid payload budget (MB)", min_value=1,
+                                        value=RENDER_BUDGET_BYTES >> 20, step=4, key="render_budget_mb"))
+    # The grid is re-sent on every edit; reuse the view until the data or the display options change.
+    render_opts = (tuple(hidden), max_chars, budget_mb)
+    memo = st.session_state.get("render_view")
+    if memo is None or memo[0] is not base or memo[1] != render_opts:
+        memo = st.session_state["render_view"] = (base, render_opts,
+                                                  *plan_render(base, hidden, max_chars, budget_mb << 20))
+    view, plan = memo[2], memo[3]
+    if plan.truncated or plan.auto_hidden:
+        notes = [f"truncated to {plan.max_chars} characters (read-only): {', '.join(map(str, plan.truncated))}"
+                 ] if plan.truncated else []
+        if plan.auto_hidden:
+            notes.append(f"hidden to stay within {budget_mb} MB: {', '.join(map(str, plan.auto_hidden))}")
+        st.caption(f"Grid payload ≈ {human_size(plan.payload_bytes)}; " + "; ".join(notes)
+                   + ". Full values are kept and saved unchanged.")
+
+    edited_df = st.data_editor(
+        view,
+        num_rows="dynamic",
+        use_container_width=True,
+        disabled=paged_mode and is_sqlite and not table.editable,
+        column_config={c: st.column_config.TextColumn(disabled=True, help="Truncated for display")
+                       for c in plan.truncated},
+        key=(f"editor_{db_table or ''}_p{page_no}_{page_size}" if paged_mode
+             else f"editor_sql_p{page_no}" if query_mode
+             else f"editor_sample_{sample_version}" if sample_mode else "editor")
+            + (f"_b{bulk_version}" if bulk_version else "")
+    )
+    # Hidden and truncated columns come back from the input, so saves and page deltas never see the display copy.
+    edited_df = merge_back(base, edited_df, plan)
+
+    if compact_load:
+        # The editor can hand back widened columns (e.g. int64 after adding a row); narrow them again where lossless.
+        edited_df = restore_dtypes_lossless(edited_df, base.dtypes)
+
+    if paged_mode:
+        overlay.record(raw_page, edited_df)
+        if overlay:
+            st.caption(f"Pending (all pages): {overlay.summary()}")
+    if sample_mode:
+        st.session_state["sample_rules_all"] = sample_rules(edited_df)
+    st.session_state["edited_df"] = edited_df
+    if sample_mode:
+        # A bulk edit of the sample would only reach the sampled rows of the file; rules cover whole-file edits.
+        st.caption("Bulk edits are off in sample mode - add a rule above to change every row of the file.")
+    elif not (paged_mode and is_sqlite and not table.editable):
+        bulk_panel(edited_df, bulk_version)
+
+def bulk_panel(edited_df: pd.DataFrame, bulk_version: int) -> None:
+    """One vectorized operation over the editor's data (or the rows matching a condition): preview counts, then apply."""
+    labels = {"replace": "Find / replace (regex)", "fillna": "Fill missing", "cast": "Change type",
+              "trim": "Trim whitespace", "case": "Change case", "dedupe": "Drop duplicates by key"}
+    with st.expander("🧰 Bulk edit", expanded=False):
+        c1, c2 = st.columns([1, 3])
+        op = c1.selectbox("Operation", BULK_OPS, format_func=labels.get, key="bulk_op")
+        columns = c2.multiselect("Key columns" if op == "dedupe" else "Columns", list(edited_df.columns),
+                                 key="bulk_cols")
+        params, fill_text = {}, None
+        if op == "replace":
+            r1, r2 = st.columns(2)
+            params["pattern"] = r1.text_input("Find", key="bulk_find")
+            params["repl"] = r2.text_input("Replace with", key="bulk_repl", help="\\1, \\2… insert regex groups")
+            r3, r4 = st.columns(2)
+            params["regex"] = r3.checkbox("Regular expression", value=True, key="bulk_regex")
+            params["case"] = r4.checkbox("Match case", value=True, key="bulk_case")
+        elif op == "fillna":
+            fill_text = st.text_input("Fill with", key="bulk_fill", help="Parsed as each column's type.")
+        elif op == "cast":
+            params["to"] = st.selectbox("New type", CAST_TYPES, key="bulk_cast",
+                                        help="Values that do not convert become missing; applies to whole columns.")
+        elif op == "case":
+            params["how"] = st.selectbox("Case", CASES, key="bulk_how")
+        elif op == "dedupe":
+            params["keep"] = st.selectbox("Keep", ["first", "last"], key="bulk_keep")
+        w1, w2, w3 = st.columns([2, 1, 2])
+        w_col = w1.selectbox("Only rows where", list(edited_df.columns), key="bulk_where_col")
+        w_op = w2.selectbox("Op", FILTER_OPS, key="bulk_where_op")
+        w_val = w3.text_input("Value", key="bulk_where_val", placeholder="empty = every row; a,b for in / between")
+
+        if not columns or (op == "replace" and not params["pattern"]) or (op == "fillna" and not fill_text):
+            st.caption("Pick columns and fill in the operation to preview it.")
+            return
+        try:
+            schema = pa.Schema.from_pandas(edited_df, preserve_index=False)
+            if fill_text is not None:
+                params["value"] = {c: parse_filter_value(schema.field(c).type, fill_text) for c in columns}
+            mask = filter_mask(edited_df, build_filter(schema, w_col, w_op, w_val)) if w_val.strip() else None
+            result = bulk_edit(edited_df, op, columns, mask, **params)
+        except Exception as e:
+            st.warning(f"Cannot preview: {e}")
+            return
+        scope = f" of {int(mask.sum()):,} matching row(s)" if mask is not None else ""
+        if op == "dedupe":
+            st.info(f"Would drop {result.rows:,} duplicate row(s){scope}.")
+        else:
+            st.info(f"Would change {result.cells:,} cell(s) in {result.rows:,} row(s){scope}"
+                    + (f"; {result.lost:,} value(s) would become missing" if result.lost else "") + ".")
+        if st.button("Apply", key="bulk_apply", disabled=not result.rows and op != "cast"):
+            # Grid edits so far are part of edited_df, so they are kept in the new input.
+            st.session_state["bulk_base"] = (data_key, result.frame, bulk_version + 1)
+            st.rerun()
+
+def add_sample_rule(added: list[EditRule]) -> None:
+    """Form callback: build a rule from the form's widgets, parsing values against the sample's column types."""
+    ss = st.session_state
+    kind, column = ss["rule_kind"], ss["rule_col"]
+    try:
+        schema = pa.Schema.from_pandas(df, preserve_index=False)
+        parse = lambda text: parse_filter_value(schema.field(column).type, text) if text.strip() else None
+        where = (tuple(build_filter(schema, ss["rule_where_col"], ss["rule_where_op"], ss["rule_where_val"]))
+                 if ss["rule_where_val"].strip() else ())
+        added.append(EditRule(kind, column=None if kind == "delete" else column, value=parse(ss["rule_value"]),
+                              old=parse(ss["rule_old"]), where=where))
+        ss.pop("rule_error", None)
+    except ValueError as e:
+        ss["rule_error"] = f"Invalid rule: {e}"
+
+def sample_rules(edited_df: pd.DataFrame) -> list[EditRule]:
+    """Rules inferred from the sample's cell edits plus the ones added by hand, listed with their sample hit counts."""
+    value_scope = st.session_state.get("sample_value_scope", False)
+    inferred, notes = rules_from_edits(df, edited_df, "value" if value_scope else "row")
+    added = st.session_state.setdefault("sample_rules", {}).setdefault(str(selected_path), [])
+    with st.expander(f"📏 Rules applied to the whole file on save ({len(inferred) + len(added)})", expanded=True):
+        st.toggle("Apply each edit to every row holding the old value", key="sample_value_scope",
+                  help="Off: only the edited rows change in the file. On: editing a to b in a column "
+                       "replaces a with b in that column everywhere in the file.")
+        for note in notes:
+            st.caption(note)
+        for rule in inferred:
+            st.markdown(f"- {rule.describe()} · {int(rule.mask(df).sum()):,} sample row(s) · _from edits_")
+        for i, rule in enumerate(added):
+            c1, c2 = st.columns([8, 1])
+            c1.markdown(f"- {rule.describe()} · {int(rule.mask(df).sum()):,} sample row(s)")
+            c2.button("✕", key=f"rule_del_{i}", help="Remove this rule", on_click=added.pop, args=(i,))
+        with st.form("add_rule", clear_on_submit=True):
+            c1, c2, c3 = st.columns([1, 2, 2])
+            c1.selectbox("Rule", RULE_KINDS, key="rule_kind")
+            c2.selectbox("Column (replace / set)", list(df.columns), key="rule_col")
+            c3.text_input("New value (empty = missing)", key="rule_value")
+            c3.text_input("Value to replace (replace only)", key="rule_old")
+            w1, w2, w3 = st.columns([2, 1, 2])
+            w1.selectbox("Where", list(df.columns), key="rule_where_col")
+            w2.selectbox("Op", FILTER_OPS, key="rule_where_op")
+            w3.text_input("Value", key="rule_where_val", placeholder="empty = every row; a,b for in / between")
+            st.form_submit_button("Add rule", on_click=add_sample_rule, args=(added,))
+        if "rule_error" in st.session_state:
+            st.error(st.session_state["rule_error"])
+    return inferred + added
+
+editor_panel()
+
+def save_current(out_path: Path, fmt: str, edited_df: pd.DataFrame, sqlite_table: str | None = None,
+                 profile: ExportProfile | str = "balanced", **write_options) -> str:
+    """Write the edited data and return a status message.
+
+    Paged mode streams the file through the page overlay, or for a SQLite table
+    sends the overlay back as targeted UPDATE/DELETE/INSERT statements. Otherwise,
+    saving over a Parquet source re-encodes only the row groups holding edits, and
+    nothing is written at all when there are no edits.
+    """
+    if paged_mode and is_sqlite:
+        if out_path.resolve() != selected_path.resolve() or (sqlite_table or db_table) != db_table:
+            raise ValueError("A SQLite table saves its edits back to itself - use Overwrite original.")
+        if not table.editable:
+            raise ValueError(f"{db_table} has no rowid or single-column primary key to update rows by.")
+        delta = overlay.to_delta()
+        if delta.is_empty():
+            return f"No changes - {db_table} left untouched"
+        apply_delta_sqlite(out_path, db_table, delta, key_col=table.key)
+        st.session_state["page_overlays"].pop(source_key, None)
+        st.session_state.pop("paged_base", None)
+        return f"Updated {db_table} in {out_path} ({delta.summary()})"
+    if sample_mode:
+        rules = st.session_state.get("sample_rules_all", [])
+        if fmt not in STREAM_FORMATS:
+            raise ValueError("Sample mode streams the whole file and saves as Parquet, Feather/Arrow, CSV, "
+                             "JSON Lines or Excel.")
+        if not rules and out_path.resolve() == selected_path.resolve():
+            return f"No rules - {out_path} left untouched"
+        if fmt == "excel" and len(sheets) > 1 and out_path.resolve() == selected_path.resolve():
+            raise ValueError("Rules stream into a single sheet - use Save As to keep the workbook's other sheets.")
+        stats = apply_rules_streaming(selected_path, rules, out_path, fmt, profile=profile, sheet_name=sheet)
+        if out_path.resolve() == selected_path.resolve():
+            st.session_state["sample_rules"].pop(str(selected_path), None)
+        touched = ", ".join(f"{n:,}" for n in stats["affected"]) or "none"
+        return (f"Applied {len(rules)} rule(s) to {stats['rows_in']:,} rows → {out_path} "
+                f"({stats['rows_out']:,} rows; rows touched per rule: {touched}; {stats['seconds']:.1f}s)")
+    if paged_mode:
+        if fmt not in PAGED_SAVE_FORMATS:
+            raise ValueError("Paged mode can save as Parquet, Feather/Arrow, CSV, JSON, JSON Lines or Excel only.")
+        if fmt == "excel" and len(sheets) > 1 and out_path.resolve() == selected_path.resolve():
+            raise ValueError("Paged mode writes a single sheet - use Save As to keep the workbook's other sheets.")
+        n = save_paged(table, overlay, out_path, fmt, profile=profile)
+        if out_path.resolve() == selected_path.resolve():
+            st.session_state["page_overlays"].pop(str(selected_path), None)
+            st.session_state.pop("paged_base", None)
+            # Other sessions may still be paging the old table, so it is dropped from the cache, not closed.
+            if on_disk:
+                open_paged_table.clear(str(selected_path), version)
+            else:
+                open_shared_table.clear(str(selected_path), version, sheet, excel_engine)
+        return f"Saved {n:,} rows to {out_path}"
+
+    if out_path.resolve() == selected_path.resolve():
+        if query_mode:
+            raise ValueError("The editor holds a query result, not this file - use Save As or export the result.")
+        if partial_load:
+            raise ValueError("Only a subset of this file is loaded - use Save As, or clear the column/row filters.")
+        delta = compute_delta(df, edited_df)
+        if delta.is_empty():
+            return f"No changes - {out_path} left untouched"
+        if fmt == "excel" and len(sheets) > 1:
+            replace_sheet(edited_df, out_path, sheet)
+            return f"Replaced sheet '{sheet}' in {out_path}"
+        # Patching addresses rows by position; a file that stores its own pandas index is rewritten instead.
+        if fmt == "parquet" and not delta.needs_rewrite and index_is_row_positions(df.index, out_path):
+            try:
+                n = apply_delta_parquet(out_path, delta)
+                return f"Patched {out_path} ({delta.summary()}; {n} row group(s) re-encoded)"
+            except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+                pass  # an edit no longer fits the file's column type - rewrite with the frame's dtypes instead
+    stats = save_df(edited_df, out_path, fmt, sqlite_table=sqlite_table, profile=profile, **write_options)
+    if fmt == "sqlite":
+        return (f"Saved to {out_path} · {sqlite_table} ({write_options.get('sqlite_mode', 'replace')}, "
+                f"{stats['rows']:,} rows, {stats['rows_per_sec']:,.0f} rows/s)")
+    if fmt == "parquet_dataset":
+        return (f"Saved to {out_path} ({stats['rows']:,} rows in {stats['partitions']:,} partition(s), "
+                f"{stats['files']:,} file(s), {stats['seconds']:.1f}s)")
+    if stats:
+        return (f"Saved to {out_path} ({stats['rows']:,} rows on {stats['sheets']} sheet(s), "
+                f"{stats['rows_per_sec']:,.0f} rows/s)")
+    return f"Saved to {out_path}"
 
 # ===========================
 #   SIDEBAR: SAVE OPTIONS
 # ===========================
-with st.sidebar:
+def reload_after_save(msg: str) -> None:
+    """
+    The file under the loaded frame was rewritten: drop the editor's state and rerun the whole app.
+
+    A fragment rerun would keep df, table and overlay from before the save, so
+    the next save would diff against stale rows (and, paged, read a table
+    whose cache entry was dropped).
+    """
+    DF_CACHE.invalidate(selected_path)
+    for key in [k for k in st.session_state if k == "editor" or str(k).startswith("editor_")]:
+        del st.session_state[key]
+    for key in ("edited_df", "bulk_base", "paged_base"):
+        st.session_state.pop(key, None)
+    st.session_state["save_message"] = msg
+    st.rerun(scope="app")
+
+@st.fragment
+def save_panel() -> None:
+    """Overwrite / Save As; typing a name or changing an option reruns only this fragment."""
+    edited_df = st.session_state["edited_df"]
     st.markdown("---")
     st.markdown("### 💾 Save Options")
+    if msg := st.session_state.pop("save_message", None):
+        st.toast(msg, icon="✅")
+        st.success(msg)
 
     # --- Overwrite same file ---
     orig_ext = selected_path.suffix.lower()
-    same_fmt = infer_fmt_from_ext(orig_ext)
+    same_fmt = "parquet_dataset" if is_dataset else infer_fmt_from_ext(orig_ext)
 
     with st.expander("Overwrite the ORIGINAL file", expanded=False):
         if st.button(f"💾 Overwrite original ({orig_ext or 'unknown'})", key="overwrite_btn"):
@@ -168,9 +752,8 @@ with st.sidebar:
                 if not same_fmt:
                     st.error(f"Unsupported original format: {orig_ext}")
                 else:
-                    save_df(edited_df, selected_path, same_fmt)
-                    st.toast(f"Saved to {selected_path}", icon="✅")
-                    st.success(f"Overwrote {selected_path}")
+                    options = {"partition_cols": partition_columns(selected_path)} if is_dataset else {}
+                    reload_after_save(save_current(selected_path, same_fmt, edited_df, **options))
             except Exception as e:
                 st.error(f"Save failed: {e}")
 
@@ -184,13 +767,69 @@ with st.sidebar:
 
         fmt_label = st.selectbox(
             "Format",
-            ["CSV (.csv)", "Parquet (.parquet)", "Excel (.xlsx)", "JSON (.json)", "Feather (.feather)",
-            "Pickle (.pickle)", "SQLite (.db)"],
+            ["CSV (.csv)", "Parquet (.parquet)", "Parquet dataset (partitioned folder)", "Excel (.xlsx)",
+             "JSON (.json)", "JSON Lines (.jsonl)", "Feather (.feather)", "Arrow IPC (.arrow)", "Pickle (.pickle)",
+             "SQLite (.db)"],
             index=1,
             key="fmt_label"
         )
         sqlite_table = st.text_input("SQLite table name (only for SQLite)", value="user_list", key="sqlite_tbl") \
                         if "SQLite" in fmt_label else None
+        write_options = {}
+        if sqlite_table is not None:
+            write_options["sqlite_mode"] = st.selectbox(
+                "Write mode", SQLITE_MODES, key="sqlite_mode",
+                help="replace: rebuild the table · append: add rows · upsert: insert or update rows by key")
+            write_options["sqlite_key"] = st.multiselect(
+                "Key column(s)", list(edited_df.columns), key="sqlite_key",
+                help="Unique key; required for upsert, indexed after the load otherwise.")
+            write_options["sqlite_indexes"] = st.multiselect(
+                "Index columns", list(edited_df.columns), key="sqlite_indexes",
+                help="One index per column, built after the rows are loaded.")
+        if fmt_label.startswith("Parquet dataset"):
+            write_options["partition_cols"] = st.multiselect(
+                "Partition by", list(edited_df.columns), key="partition_cols",
+                help="One folder per value (col=value/), so readers filtering on these columns skip the rest.")
+            write_options["max_rows_per_file"] = int(st.number_input(
+                "Max rows per file", min_value=1_000, step=100_000, value=DATASET_FILE_ROWS, key="dataset_file_rows"))
+        export_profile = "balanced"
+        if fmt_label.startswith(("Parquet", "Feather", "Arrow")):
+            is_ipc = not fmt_label.startswith("Parquet")
+            profile_name = st.selectbox("Export profile", list(EXPORT_PROFILES), key="export_profile")
+            base_profile = EXPORT_PROFILES[profile_name]
+            st.caption(base_profile.description)
+            overrides = {}
+            if paged_mode:
+                st.caption("Rows keep their file order in paged mode.")
+            else:
+                overrides["sort_by"] = st.multiselect("Sort rows by", list(edited_df.columns), key="export_sort",
+                                                      help="Sorted columns give readers tight min/max statistics "
+                                                           "to skip row groups and pages.")
+            # Keys carry the profile name so switching profiles resets the fields to its values.
+            if st.toggle("Tune profile", key="tune_profile"):
+                if is_ipc:
+                    overrides["ipc_compression"] = st.selectbox(
+                        "IPC compression", IPC_COMPRESSIONS, key=f"ipc_codec_{profile_name}",
+                        index=IPC_COMPRESSIONS.index(base_profile.ipc_compression),
+                        help="Uncompressed files reload zero-copy via memory mapping.")
+                else:
+                    overrides["compression"] = st.selectbox(
+                        "Codec", PARQUET_CODECS, key=f"pq_codec_{profile_name}",
+                        index=PARQUET_CODECS.index(base_profile.compression))
+                    overrides["row_group_rows"] = int(st.number_input(
+                        "Rows per row group", min_value=1024, step=64 * 1024, key=f"pq_rg_{profile_name}",
+                        value=base_profile.row_group_rows))
+                    overrides["use_dictionary"] = st.checkbox(
+                        "Dictionary encoding", value=base_profile.use_dictionary, key=f"pq_dict_{profile_name}")
+                    overrides["write_statistics"] = st.checkbox(
+                        "Column statistics", value=base_profile.write_statistics, key=f"pq_stats_{profile_name}")
+                    overrides["write_page_index"] = st.checkbox(
+                        "Page index", value=base_profile.write_page_index, key=f"pq_pidx_{profile_name}")
+                level = st.number_input("Compression level (0 = codec default)", min_value=0, max_value=22,
+                                        value=base_profile.compression_level or 0, key=f"codec_level_{profile_name}",
+                                        help="Used by zstd, gzip and brotli.")
+                overrides["compression_level"] = int(level) or None
+            export_profile = resolve_profile(profile_name, **overrides)
         overwrite = st.checkbox("Overwrite if file exists", value=True, key="overwrite_chk")
 
         if st.button("💾 Save As", key="saveas_btn"):
@@ -202,13 +841,46 @@ with st.sidebar:
                 if exists and not overwrite and not fmt_label.startswith("SQLite"):
                     st.error(f"File exists: {out_path}. Uncheck 'Overwrite' or change the name.")
                 else:
-                    fmt = "sqlite" if "SQLite" in fmt_label else infer_fmt_from_ext(out_path.suffix)
+                    fmt = ("sqlite" if "SQLite" in fmt_label
+                           else "parquet_dataset" if fmt_label.startswith("Parquet dataset")
+                           else infer_fmt_from_ext(out_path.suffix))
                     if not fmt:
                         raise ValueError(f"Cannot infer format from extension: {out_path.suffix}")
-                    save_df(edited_df, out_path, fmt, sqlite_table=sqlite_table)
-                    st.toast(f"Saved to {out_path}", icon="✅")
-                    st.success(f"Saved to {out_path}")
+                    msg = save_current(out_path, fmt, edited_df, sqlite_table=sqlite_table, profile=export_profile,
+                                       **write_options)
+                    if out_path.resolve() == selected_path.resolve():
+                        reload_after_save(msg)
+                    st.toast(msg, icon="✅")
+                    st.success(msg)
             except Exception as e:
                 st.error(f"Save failed: {e}")
 
+        if query_mode and st.button("⬇️ Export full query result", key="sql_export_btn",
+                                    help="Streams every result row through DuckDB (Parquet, CSV, JSON or JSON "
+                                         "Lines); edits made in the editor are not included."):
+            try:
+                out_path = Path(dest_dir).expanduser() / f"{base_name}{ext_for(fmt_label)}"
+                if out_path.exists() and not overwrite:
+                    st.error(f"File exists: {out_path}. Uncheck 'Overwrite' or change the name.")
+                else:
+                    out_path.parent.mkdir(parents=True, exist_ok=True)
+                    n = export_query(sql_text, out_path, infer_fmt_from_ext(out_path.suffix), **query_sources)
+                    st.success(f"Exported {n:,} rows to {out_path}")
+            except Exception as e:
+                st.error(f"Export failed: {e}")
+
+with st.sidebar:
+    save_panel()
+
+    with st.expander("🧠 DataFrame cache", expanded=False):
+        budget_mb = st.number_input("Memory budget (MB)", min_value=64, step=256,
+                                    value=DF_CACHE.max_bytes // (1024 * 1024), key="cache_budget_mb")
+        if budget_mb * 1024 * 1024 != DF_CACHE.max_bytes:
+            DF_CACHE.set_max_bytes(int(budget_mb) * 1024 * 1024)
+        stats = DF_CACHE.stats()
+        st.caption(f"{stats['entries']} frame(s), {stats['bytes'] / 1e6:,.1f} MB of {stats['max_bytes'] / 1e6:,.0f} MB · "
+                   f"hits {stats['hits']} · misses {stats['misses']} · evictions {stats['evictions']}")
+        if st.button("Clear cache", key="cache_clear"):
+            DF_CACHE.clear()
+
     st.caption("Tip: Change the search root and click Rescan to browse other folders.")
@@ -0,0 +1,144 @@
+import os
+import threading
+from collections import OrderedDict
+from functools import partial
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+from file_scanner import dataset_stats
+
+# Budget for all cached frames together, measured with memory_usage(deep=True).
+# Override with DATA_EDITOR_CACHE_MB before starting the app.
+DEFAULT_MAX_BYTES = int(os.environ.get("DATA_EDITOR_CACHE_MB", "1024")) * 1024 * 1024
+
+
+def file_signature(p: Path) -> tuple[str, int, int]:
+    """Return (resolved path, size, mtime_ns) - changes whenever the file (or a dataset folder's contents) is rewritten."""
+    p = Path(p).expanduser().resolve()
+    if p.is_dir():
+        return (str(p), *dataset_stats(p))
+    st = p.stat()
+    return str(p), st.st_size, st.st_mtime_ns
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    """Deep in-memory size of a DataFrame (includes python string payloads)."""
+    try:
+        return int(df.memory_usage(index=True, deep=True).sum())
+    except Exception:
+        return int(df.memory_usage(index=True).sum())
+
+
+def loader_key(loader) -> object:
+    """
+    Stable identity of a loader for cache keys: module.qualname for functions,
+    recursing into a partial's function, arguments and keywords.
+
+    Callables passed as arguments (progress callbacks) count by name only, so a
+    fresh lambda on every rerun still hits the cache.
+    """
+    if isinstance(loader, partial):
+        return (loader_key(loader.func), tuple(loader_key(a) for a in loader.args),
+                tuple(sorted((k, loader_key(v)) for k, v in loader.keywords.items())))
+    if callable(loader):
+        return f"{getattr(loader, '__module__', '')}.{getattr(loader, '__qualname__', type(loader).__qualname__)}"
+    return repr(loader)
+
+
+class DataFrameCache:
+    """
+    Process-wide LRU cache of loaded DataFrames.
+
+    Entries are keyed on (resolved path, size, mtime_ns, reader options, loader),
+    so an edited file is never served stale and two loaders of one file (say
+    plain and compacted) never share an entry. Frames are shared between Streamlit
+    sessions and must be treated as read-only by callers.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[tuple, tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(p: Path, loader=None, **options) -> tuple:
+        return file_signature(p) + (tuple(sorted((k, repr(v)) for k, v in options.items())), loader_key(loader))
+
+    def get_or_load(self, p: Path, loader: Callable[..., pd.DataFrame], **options) -> pd.DataFrame:
+        """Return the cached frame for p/options, calling loader(p, **options) on a miss."""
+        key = self.make_key(p, loader, **options)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Parse outside the lock so one slow file does not block other sessions.
+        df = loader(p, **options)
+        self.put(key, df)
+        return df
+
+    def put(self, key: tuple, df: pd.DataFrame) -> None:
+        nbytes = frame_nbytes(df)
+        with self._lock:
+            self._drop_stale(key)
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            if nbytes > self.max_bytes:
+                return  # larger than the whole budget - never cache it
+            self._entries[key] = (df, nbytes)
+            self.current_bytes += nbytes
+            self._evict_to(self.max_bytes)
+
+    def _drop_stale(self, key: tuple) -> None:
+        """Forget older versions of the same file (same path, different size/mtime)."""
+        path, size, mtime_ns = key[:3]
+        for k in [k for k in self._entries if k[0] == path and k[1:3] != (size, mtime_ns)]:
+            self.current_bytes -= self._entries.pop(k)[1]
+            self.evictions += 1
+
+    def _evict_to(self, limit: int) -> None:
+        while self._entries and self.current_bytes > limit:
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self.current_bytes -= nbytes
+            self.evictions += 1
+
+    def invalidate(self, p: Path) -> None:
+        """Drop every cached variant of p (e.g. after saving over it)."""
+        path = str(Path(p).expanduser().resolve())
+        with self._lock:
+            for k in [k for k in self._entries if k[0] == path]:
+                self.current_bytes -= self._entries.pop(k)[1]
+
+    def set_max_bytes(self, max_bytes: int) -> None:
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict_to(max_bytes)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# Module globals survive Streamlit reruns, so this instance is shared by every session.
+DF_CACHE = DataFrameCache()
@@ -0,0 +1,113 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+# Strings become category when distinct values are at most this share of non-null values.
+CATEGORY_MAX_RATIO = 0.5
+# Arrow-backed strings: one contiguous buffer instead of a Python object per cell.
+ARROW_STRING = pd.StringDtype("pyarrow")
+REPORT_ATTR = "compaction"
+
+
+class ColumnCompaction(NamedTuple):
+    column: str
+    before: str
+    after: str
+    before_bytes: int
+    after_bytes: int
+
+
+def _column_bytes(s: pd.Series) -> int:
+    return int(s.memory_usage(index=False, deep=True))
+
+
+def _same_values(a: pd.Series, b: pd.Series) -> bool:
+    """True when b holds exactly a's values (missing where a is missing)."""
+    both_na = a.isna().to_numpy() & b.isna().to_numpy()
+    eq = (a.astype(object) == b.astype(object)).to_numpy(dtype=bool, na_value=False)
+    return bool((eq | both_na).all())
+
+
+def compact_series(s: pd.Series, category_max_ratio: float = CATEGORY_MAX_RATIO) -> pd.Series:
+    """
+    s in the smallest dtype that holds the same values, or s unchanged.
+
+    Integers are downcast to the narrowest (unsigned when non-negative) width,
+    floats go to float32 only when every value survives the round trip, and
+    string columns become category when low-cardinality, Arrow strings otherwise.
+    """
+    dtype = s.dtype
+    # Arrow-backed columns (memory-mapped Feather/IPC) are already compact; converting would copy them.
+    if (isinstance(dtype, (pd.CategoricalDtype, pd.ArrowDtype)) or pd.api.types.is_bool_dtype(dtype)
+            or not s.notna().any()):
+        return s
+    if pd.api.types.is_integer_dtype(dtype):
+        return pd.to_numeric(s, downcast="unsigned" if s.min() >= 0 else "integer")
+    if dtype == np.float64:
+        narrow = s.to_numpy().astype(np.float32)
+        if np.array_equal(narrow.astype(np.float64), s.to_numpy(), equal_nan=True):
+            return pd.Series(narrow, index=s.index, name=s.name)
+        return s
+    if dtype == object or pd.api.types.is_string_dtype(dtype):
+        values = s.dropna()
+        if pd.api.types.infer_dtype(values, skipna=True) != "string":
+            return s  # mixed objects (numbers, lists, ...) stay as they are
+        if values.nunique() <= category_max_ratio * len(values):
+            return s.astype("category")
+        return s.astype(ARROW_STRING) if dtype == object else s  # string dtypes are Arrow-backed already
+    return s
+
+
+def compact_frame(df: pd.DataFrame, category_max_ratio: float = CATEGORY_MAX_RATIO) -> pd.DataFrame:
+    """
+    Copy of df with every column in its compact dtype.
+
+    The per-column before/after dtypes and sizes are kept in
+    result.attrs["compaction"] (see compaction_report), so the saving can be
+    shown without holding on to the original frame.
+    """
+    out, report = {}, []
+    for col in df.columns:
+        s = df[col]
+        compact = compact_series(s, category_max_ratio)
+        out[col] = compact
+        before = _column_bytes(s)
+        report.append(ColumnCompaction(str(col), str(s.dtype), str(compact.dtype), before,
+                                       before if compact is s else _column_bytes(compact)))
+    result = pd.DataFrame(out, index=df.index)
+    result.attrs[REPORT_ATTR] = report
+    return result
+
+
+def compaction_report(df: pd.DataFrame) -> pd.DataFrame | None:
+    """Per-column memory before/after compaction, or None for a frame that was not compacted."""
+    rows = df.attrs.get(REPORT_ATTR)
+    if not rows:
+        return None
+    report = pd.DataFrame(rows, columns=ColumnCompaction._fields).set_index("column")
+    report["saved"] = 1 - report["after_bytes"] / report["before_bytes"].clip(lower=1)
+    return report
+
+
+def restore_dtypes_lossless(df: pd.DataFrame, dtypes: pd.Series) -> pd.DataFrame:
+    """
+    Cast df's columns back to dtypes where no value changes.
+
+    The editor can widen a column (a new row, a value outside the categories,
+    an integer too large for int8); such a column keeps its wider dtype rather
+    than being truncated or nulled.
+    """
+    out = df
+    for col, dtype in dtypes.items():
+        if col not in df.columns or df[col].dtype == dtype:
+            continue
+        try:
+            cast = df[col].astype(dtype)
+        except (TypeError, ValueError, OverflowError):
+            continue
+        if _same_values(df[col], cast):
+            if out is df:
+                out = df.copy()
+            out[col] = cast
+    return out
@@ -0,0 +1,177 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from atomic_io import atomic_write
+from sqlite_io import bulk_connection, iter_row_batches, quote_ident, sql_value
+
+
+@dataclass
+class EditDelta:
+    """
+    Structured difference between a loaded frame and its edited copy.
+
+    Row ids are index labels of the loaded frame (its row position in the
+    source file, or the SQLite rowid). changed maps row id -> {column: value};
+    inserted holds the new rows; deleted lists removed row ids. needs_rewrite
+    is set when the frames cannot be diffed cell by cell (columns differ or
+    labels are not unique), so sinks must write the whole frame.
+    """
+    changed: dict = field(default_factory=dict)
+    inserted: pd.DataFrame = field(default_factory=pd.DataFrame)
+    deleted: list = field(default_factory=list)
+    needs_rewrite: bool = False
+
+    def is_empty(self) -> bool:
+        return not (self.changed or len(self.inserted) or self.deleted or self.needs_rewrite)
+
+    def n_cells(self) -> int:
+        return sum(len(cols) for cols in self.changed.values())
+
+    def summary(self) -> str:
+        return (f"{self.n_cells():,} changed cell(s) in {len(self.changed):,} row(s), "
+                f"{len(self.inserted):,} inserted, {len(self.deleted):,} deleted")
+
+
+def compute_delta(original: pd.DataFrame, edited: pd.DataFrame) -> EditDelta:
+    """Vectorized cell/insert/delete diff of edited against original, matched on index labels."""
+    if (list(original.columns) != list(edited.columns)
+            or not original.index.is_unique or not edited.index.is_unique):
+        return EditDelta(needs_rewrite=True)
+
+    in_orig = edited.index.isin(original.index)
+    deleted = original.index[~original.index.isin(edited.index)].tolist()
+    inserted = edited[~in_orig]
+
+    cur = edited[in_orig]
+    base = original.loc[cur.index]
+    # NaN != NaN, so cells that are missing on both sides are not edits.
+    neq = cur.ne(base).fillna(True) & ~(cur.isna() & base.isna())
+    changed: dict = {}
+    rows, cols = neq.to_numpy(dtype=bool).nonzero()
+    for r, c in zip(rows.tolist(), cols.tolist()):
+        changed.setdefault(cur.index[r], {})[cur.columns[c]] = cur.iat[r, c]
+    return EditDelta(changed=changed, inserted=inserted, deleted=deleted)
+
+
+def apply_delta(original: pd.DataFrame, delta: EditDelta) -> pd.DataFrame:
+    """original with delta applied (rows keep their labels; inserts are appended)."""
+    df = original.drop(index=delta.deleted)
+    for rid, cols in delta.changed.items():
+        for col, val in cols.items():
+            df.at[rid, col] = val
+    if len(delta.inserted):
+        df = pd.concat([df, delta.inserted])
+    return df
+
+
+def apply_delta_sqlite(db_file: Path, table_name: str, delta: EditDelta, key_col: str = "rowid") -> None:
+    """Apply delta in one transaction: UPDATE changed rows, DELETE removed ones, INSERT new ones.
+
+    Row ids in the delta must be values of key_col (rowid or the primary key).
+    Updates touching the same set of columns share one executemany, so only
+    the edited rows are written - the rest of the table is never rewritten.
+    """
+    tbl, key = quote_ident(table_name), quote_ident(key_col) if key_col != "rowid" else "rowid"
+    by_columns: dict[tuple, list] = {}
+    for rid, cols in delta.changed.items():
+        by_columns.setdefault(tuple(cols), []).append([sql_value(v) for v in cols.values()] + [sql_value(rid)])
+    with bulk_connection(db_file) as conn:
+        for cols, rows in by_columns.items():
+            assignments = ", ".join(f"{quote_ident(c)} = ?" for c in cols)
+            conn.executemany(f"UPDATE {tbl} SET {assignments} WHERE {key} = ?", rows)
+        if delta.deleted:
+            conn.executemany(f"DELETE FROM {tbl} WHERE {key} = ?", [(sql_value(r),) for r in delta.deleted])
+        if len(delta.inserted):
+            cols = list(delta.inserted.columns)
+            placeholders = ", ".join("?" for _ in cols)
+            sql = f"INSERT INTO {tbl} ({', '.join(quote_ident(c) for c in cols)}) VALUES ({placeholders})"
+            for batch in iter_row_batches(delta.inserted):
+                conn.executemany(sql, batch)
+
+
+def _writer_options(metadata: pq.FileMetaData, delta: EditDelta | None = None) -> dict:
+    """ParquetWriter settings that reproduce how a file was written: per-column codec, dictionary, statistics,
+    page index, sort order and format version (compression levels are not recorded in the footer).
+
+    The sort order is dropped when delta inserts rows (a trailing group) or
+    edits a sort column, since the data may no longer be in that order."""
+    if metadata.num_row_groups == 0:
+        return {}
+    rg = metadata.row_group(0)
+    cols = [rg.column(i) for i in range(rg.num_columns)]
+    codec = {"LZ4_RAW": "lz4", "LZ4": "lz4"}
+    options = {
+        "compression": {c.path_in_schema: codec.get(c.compression, c.compression.lower()) for c in cols},
+        "use_dictionary": [c.path_in_schema for c in cols
+                           if {"RLE_DICTIONARY", "PLAIN_DICTIONARY"} & set(c.encodings)],
+        "write_statistics": [c.path_in_schema for c in cols if c.is_stats_set],
+        "write_page_index": any(c.has_offset_index for c in cols),
+        "version": metadata.format_version,
+    }
+    if rg.sorting_columns:
+        sort_names = {metadata.schema.column(c.column_index).path.split(".")[0] for c in rg.sorting_columns}
+        edited = {col for cols in delta.changed.values() for col in cols} if delta is not None else set()
+        if delta is None or not (len(delta.inserted) or sort_names & set(map(str, edited))):
+            options["sorting_columns"] = rg.sorting_columns
+    return options
+
+
+def index_is_row_positions(index: pd.Index, p: Path) -> bool:
+    """
+    True when index is RangeIndex(0, n) for the n rows of Parquet file p.
+
+    A file written with its pandas index (e.g. df[mask].to_parquet()) loads
+    with labels that are not positions, and cannot be patched by row id.
+    """
+    return isinstance(index, pd.RangeIndex) and index.equals(pd.RangeIndex(pq.read_metadata(p).num_rows))
+
+
+def apply_delta_parquet(p: Path, delta: EditDelta) -> int:
+    """
+    Patch a Parquet file in place, row group by row group; returns row groups re-encoded.
+
+    Row ids are row positions in the file (see index_is_row_positions); an id
+    outside 0..num_rows-1 raises ValueError. Untouched row groups pass through
+    as Arrow tables without a pandas round trip; only groups holding changed or
+    deleted rows are patched, and inserts become a trailing row group. The
+    writer reuses the file's codecs, encodings, row-group sizes and (unless the
+    edit may break it) sort order, so a patch keeps the export profile it was
+    written with. The result is
+    written to a temp file and atomically renamed over p.
+    """
+    p = Path(p)
+    pf = pq.ParquetFile(p)
+    schema = pf.schema_arrow
+    deleted = set(delta.deleted)
+    touched_ids = set(delta.changed) | deleted
+    num_rows = pf.metadata.num_rows
+    if not all(isinstance(r, (int, np.integer)) and 0 <= r < num_rows for r in touched_ids):
+        pf.close()
+        raise ValueError(f"Row ids of the edit are not row positions in {p.name}")
+    patched = 0
+    with atomic_write(p) as tmp:
+        with pq.ParquetWriter(tmp, schema, **_writer_options(pf.metadata, delta)) as writer:
+            first = 0
+            for i in range(pf.num_row_groups):
+                n = pf.metadata.row_group(i).num_rows
+                group = pf.read_row_group(i)
+                ids = [r for r in touched_ids if first <= r < first + n]
+                if ids:
+                    part = group.to_pandas()
+                    part.index = pd.RangeIndex(first, first + n)
+                    sub = EditDelta(changed={r: delta.changed[r] for r in ids if r in delta.changed},
+                                    deleted=[r for r in ids if r in deleted])
+                    group = pa.Table.from_pandas(apply_delta(part, sub), schema=schema, preserve_index=False)
+                    patched += 1
+                writer.write_table(group, row_group_size=max(n, 1))
+                first += n
+            if len(delta.inserted):
+                writer.write_table(pa.Table.from_pandas(delta.inserted, schema=schema, preserve_index=False))
+                patched += 1
+        pf.close()
+    return patched
@@ -0,0 +1,172 @@
+import shutil
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, NamedTuple
+
+import pandas as pd
+
+from atomic_io import atomic_write
+
+try:  # Rust-based reader, typically 5-10x faster than openpyxl
+    import python_calamine  # noqa: F401
+    HAS_CALAMINE = True
+except ImportError:
+    HAS_CALAMINE = False
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+EXCEL_EXTS = {".xlsx", ".xls"}
+EXCEL_MAX_ROWS = 1_048_576  # per sheet, header row included
+EXCEL_ENGINES = ["auto", "calamine", "openpyxl"]
+PROGRESS_ROWS = 10_000
+
+
+class SheetInfo(NamedTuple):
+    name: str
+    n_rows: int | None    # from the sheet's <dimension> tag; None when the writer omitted it
+    n_cols: int | None
+
+
+def list_sheets(p: Path) -> list[SheetInfo]:
+    """Sheet names and dimensions without loading any cell data."""
+    p = Path(p)
+    if p.suffix.lower() != ".xlsx":
+        return [SheetInfo(name, None, None) for name in pd.ExcelFile(p).sheet_names]
+    from openpyxl import load_workbook
+
+    wb = load_workbook(p, read_only=True)
+    try:
+        sheets = []
+        for ws in wb.worksheets:
+            try:
+                sheets.append(SheetInfo(ws.title, ws.max_row, ws.max_column))
+            except ValueError:  # unsized sheet
+                sheets.append(SheetInfo(ws.title, None, None))
+        return sheets
+    finally:
+        wb.close()
+
+
+def iter_sheet_rows(p: Path, sheet_name: str | None, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Stream an .xlsx sheet through openpyxl read-only mode as DataFrames of chunk_rows rows."""
+    from openpyxl import load_workbook
+
+    # read_only mode parses the sheet XML incrementally instead of building the workbook DOM.
+    wb = load_workbook(p, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name] if sheet_name else wb.worksheets[0]
+        rows = ws.iter_rows(values_only=True)
+        header = [str(h) if h is not None else f"Unnamed: {i}" for i, h in enumerate(next(rows, ()))]
+        while True:
+            block = list(islice(rows, chunk_rows))
+            if not block:
+                return
+            yield pd.DataFrame.from_records(block, columns=header)
+    finally:
+        wb.close()
+
+
+def read_sheet(p: Path, sheet_name: str | None = None, engine: str = "auto",
+               progress: Callable[[float], None] | None = None) -> pd.DataFrame:
+    """
+    Load one sheet (default: the first).
+
+    "calamine" (or "auto" when python-calamine is installed) parses the sheet
+    in Rust in one call. "openpyxl" streams rows in read-only mode and reports
+    progress(fraction) every PROGRESS_ROWS rows; .xls files always go
+    through pandas' default engine.
+    """
+    p = Path(p)
+    if p.suffix.lower() != ".xlsx":
+        return pd.read_excel(p, sheet_name=sheet_name or 0)
+    if engine == "calamine" or (engine == "auto" and HAS_CALAMINE):
+        return pd.read_excel(p, sheet_name=sheet_name or 0, engine="calamine")
+
+    total = None
+    if progress is not None:
+        info = next((s for s in list_sheets(p) if sheet_name in (None, s.name)), None)
+        total = info.n_rows if info else None
+    parts, done = [], 0
+    for part in iter_sheet_rows(p, sheet_name, PROGRESS_ROWS):
+        parts.append(part)
+        done += len(part)
+        if progress is not None and total:
+            progress(min(done / total, 1.0))
+    if not parts:
+        return pd.DataFrame()
+    # Records come back as Python objects; let pandas settle on int/float/datetime columns.
+    return pd.concat(parts, ignore_index=True).infer_objects()
+
+
+def replace_sheet(df: pd.DataFrame, p: Path, sheet_name: str) -> None:
+    """Rewrite one sheet of an existing workbook, leaving its other sheets in place."""
+    # Edit a copy so a failure halfway through cannot corrupt the original workbook.
+    with atomic_write(p) as tmp:
+        shutil.copyfile(p, tmp)
+        with pd.ExcelWriter(tmp, engine="openpyxl", mode="a", if_sheet_exists="replace") as writer:
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
+
+
+def _cell_rows(chunk: pd.DataFrame) -> Iterator[tuple]:
+    """Rows of plain Python values xlsxwriter can type: NaN/NaT -> None, tz-aware -> naive."""
+    chunk = chunk.copy()
+    for col in chunk.columns:
+        if isinstance(chunk[col].dtype, pd.DatetimeTZDtype):
+            chunk[col] = chunk[col].dt.tz_localize(None)
+    out = chunk.astype(object).where(chunk.notna(), None)
+    return out.itertuples(index=False, name=None)
+
+
+def write_excel_streaming(data: pd.DataFrame | Iterable[pd.DataFrame], p: Path, sheet_name: str = "Sheet1",
+                          chunk_rows: int = 50_000) -> dict:
+    """
+    Write a DataFrame or an iterator of DataFrame chunks (e.g. iter_df) to .xlsx in constant memory.
+
+    Uses xlsxwriter's constant_memory mode, which flushes each row to disk as soon
+    as the next one starts, so peak memory is one chunk regardless of total size.
+    Rows past Excel's 1,048,576-row limit continue on "<sheet>_2", "<sheet>_3"...
+    The workbook is built in a temp file and renamed over p once closed.
+    Returns rows, sheets, seconds and rows_per_sec.
+    """
+    with atomic_write(p) as tmp:
+        return _write_excel(data, tmp, sheet_name, chunk_rows)
+
+
+def _write_excel(data: pd.DataFrame | Iterable[pd.DataFrame], p: Path, sheet_name: str, chunk_rows: int) -> dict:
+    start = time.perf_counter()
+    chunks = ([data.iloc[i:i + chunk_rows] for i in range(0, max(len(data), 1), chunk_rows)]
+              if isinstance(data, pd.DataFrame) else data)
+    if xlsxwriter is None:  # no streaming writer available: materialize and let pandas write it
+        df = pd.concat(list(chunks), ignore_index=True)
+        df.to_excel(p, index=False, sheet_name=sheet_name)
+        return {"rows": len(df), "sheets": 1, "seconds": time.perf_counter() - start,
+                "rows_per_sec": len(df) / max(time.perf_counter() - start, 1e-9)}
+
+    wb = xlsxwriter.Workbook(str(p), {"constant_memory": True, "strings_to_urls": False,
+                                      "default_date_format": "yyyy-mm-dd hh:mm:ss"})
+    ws, header, row, sheets, total = None, None, 0, 0, 0
+    try:
+        for chunk in chunks:
+            if header is None:
+                header = [str(c) for c in chunk.columns]
+            for values in _cell_rows(chunk):
+                if ws is None or row >= EXCEL_MAX_ROWS:
+                    sheets += 1
+                    ws = wb.add_worksheet(sheet_name if sheets == 1 else f"{sheet_name}_{sheets}")
+                    ws.write_row(0, 0, header)
+                    row = 1
+                ws.write_row(row, 0, values)
+                row += 1
+                total += 1
+        if ws is None:  # empty input still produces a sheet with the header
+            ws = wb.add_worksheet(sheet_name)
+            ws.write_row(0, 0, header or [])
+            sheets = 1
+    finally:
+        wb.close()
+    seconds = time.perf_counter() - start
+    return {"rows": total, "sheets": sheets, "seconds": seconds, "rows_per_sec": total / max(seconds, 1e-9)}
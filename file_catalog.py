@@ -0,0 +1,344 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable
+
+from file_scanner import (DATASET_SUFFIXES, DEFAULT_SKIP_DIRS, FileEntry, dataset_root, dataset_stats, is_dataset_dir,
+                          is_ignored_name, walk_data_files, walk_subtree)
+
+try:  # watchdog drives inotify on Linux (FSEvents / ReadDirectoryChangesW elsewhere)
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # fall back to periodic re-walks
+    FileSystemEventHandler = object
+    Observer = None
+
+# No file suffix on purpose, so the catalog never lists itself as a data file.
+CATALOG_NAME = ".data_editor_catalog"
+POLL_SECONDS = 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path      TEXT PRIMARY KEY,
+    ext       TEXT NOT NULL,
+    size      INTEGER NOT NULL,
+    mtime_ns  INTEGER NOT NULL,
+    n_rows    INTEGER,
+    n_cols    INTEGER
+);
+CREATE INDEX IF NOT EXISTS files_ext ON files(ext);
+"""
+
+# Trigram FTS5 index makes "filename contains" an index lookup (SQLite >= 3.34).
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS files_fts USING fts5(path, content='files', tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS files_ai AFTER INSERT ON files BEGIN
+    INSERT INTO files_fts(rowid, path) VALUES (new.rowid, new.path);
+END;
+CREATE TRIGGER IF NOT EXISTS files_ad AFTER DELETE ON files BEGIN
+    INSERT INTO files_fts(files_fts, rowid, path) VALUES ('delete', old.rowid, old.path);
+END;
+CREATE TRIGGER IF NOT EXISTS files_au AFTER UPDATE OF path ON files BEGIN
+    INSERT INTO files_fts(files_fts, rowid, path) VALUES ('delete', old.rowid, old.path);
+    INSERT INTO files_fts(rowid, path) VALUES (new.rowid, new.path);
+END;
+"""
+
+
+# Insert or refresh one entry; cached shape survives only if size and mtime are unchanged.
+_UPSERT = ("INSERT INTO files(path, ext, size, mtime_ns) VALUES (?, ?, ?, ?) "
+           "ON CONFLICT(path) DO UPDATE SET size = excluded.size, mtime_ns = excluded.mtime_ns, "
+           "n_rows = CASE WHEN files.mtime_ns = excluded.mtime_ns AND files.size = excluded.size "
+           "THEN files.n_rows END, "
+           "n_cols = CASE WHEN files.mtime_ns = excluded.mtime_ns AND files.size = excluded.size "
+           "THEN files.n_cols END")
+
+
+def scan_settings_key(exts: Iterable[str], skip_dirs: Iterable[str], max_depth: int | None) -> str:
+    """Short digest of what a walk includes; catalogs of one root with different settings never share rows."""
+    settings = repr((sorted(exts), sorted(skip_dirs), max_depth))
+    return hashlib.sha1(settings.encode()).hexdigest()[:12]
+
+
+def default_catalog_path(root: Path, settings_key: str = "") -> Path:
+    """Catalog lives under the search root; falls back to ~/.cache when the root is read-only."""
+    name = f"{CATALOG_NAME}-{settings_key}" if settings_key else CATALOG_NAME
+    if os.access(root, os.W_OK):
+        return root / name
+    cache_dir = Path.home() / ".cache" / "data_editor"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir / f"{hashlib.sha1(str(root).encode()).hexdigest()[:16]}{name}"
+
+
+class FileCatalog:
+    """
+    Persistent SQLite catalog of the data files under a search root.
+
+    Holds path, extension, size, mtime and (once a file has been opened) its
+    row/column counts. refresh() reconciles against a fresh walk; the watcher
+    applies single-file adds, deletes and renames as they happen.
+    """
+
+    def __init__(self, root_dir: str | Path, exts: Iterable[str], skip_dirs: Iterable[str] = DEFAULT_SKIP_DIRS,
+                 max_depth: int | None = None, db_path: Path | None = None):
+        self.root = Path(root_dir).expanduser().resolve()
+        self.exts = frozenset(e.lower() for e in exts)
+        self.skip_dirs = frozenset(skip_dirs)
+        self.max_depth = max_depth
+        # One database per root *and* scan settings: a depth-0 refresh must not prune another catalog's deep files.
+        self.db_path = db_path or default_catalog_path(
+            self.root, scan_settings_key(self.exts, self.skip_dirs, max_depth))
+        self._lock = threading.Lock()
+        self._watcher = None
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            try:
+                conn.executescript(_FTS_SCHEMA)
+                self.has_fts = True
+            except sqlite3.OperationalError:
+                self.has_fts = False
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # ---------- Queries ----------
+    def is_empty(self) -> bool:
+        with self._connect() as conn:
+            return conn.execute("SELECT 1 FROM files LIMIT 1").fetchone() is None
+
+    def entries(self) -> list[FileEntry]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT path, size, mtime_ns FROM files ORDER BY path COLLATE NOCASE").fetchall()
+        return [FileEntry(*r) for r in rows]
+
+    def search(self, text: str, limit: int | None = None) -> list[FileEntry]:
+        """Case-insensitive 'path contains text', answered from the trigram index when possible."""
+        text = text.strip()
+        if not text:
+            return self.entries() if limit is None else self.entries()[:limit]
+        like = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        with self._connect() as conn:
+            if self.has_fts and len(text) >= 3:
+                sql = ("SELECT f.path, f.size, f.mtime_ns FROM files_fts JOIN files f ON f.rowid = files_fts.rowid "
+                       "WHERE files_fts MATCH ? ORDER BY f.path COLLATE NOCASE")
+                params = ['"' + text.replace('"', '""') + '"']
+            else:  # trigram needs 3+ chars; short needles scan the (small) path column
+                sql = "SELECT path, size, mtime_ns FROM files WHERE path LIKE ? ESCAPE '\\' ORDER BY path COLLATE NOCASE"
+                params = [like]
+            if limit is not None:
+                sql += f" LIMIT {int(limit)}"
+            rows = conn.execute(sql, params).fetchall()
+        return [FileEntry(*r) for r in rows]
+
+    def shape(self, rel: str) -> tuple[int, int] | None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT n_rows, n_cols FROM files WHERE path = ?", (rel,)).fetchone()
+        return (row[0], row[1]) if row and row[0] is not None else None
+
+    # ---------- Incremental updates ----------
+    def _rel(self, path: str | Path) -> str | None:
+        """Relative posix path of the catalogued entry `path` belongs to (a data file or dataset folder), else None."""
+        try:
+            rel = Path(path).resolve().relative_to(self.root).as_posix()
+        except (ValueError, OSError):
+            return None
+        if rel == "." or any(is_ignored_name(part) for part in rel.split("/")):
+            return None
+        root = dataset_root(rel, self.root)
+        if root is not None or is_dataset_dir(self.root / rel):
+            if self.exts.isdisjoint(DATASET_SUFFIXES):
+                return None
+            rel = root or rel
+        elif Path(rel).suffix.lower() not in self.exts:
+            return None
+        parts = rel.split("/")
+        if any(part in self.skip_dirs for part in parts[:-1]):
+            return None
+        if self.max_depth is not None and len(parts) - 1 > self.max_depth:
+            return None
+        return rel
+
+    def _in_scope(self, path: str | Path) -> bool:
+        """False for a directory a walk would never list files from: under skip_dirs, hidden or past max_depth."""
+        try:
+            parts = Path(path).resolve().relative_to(self.root).parts
+        except (ValueError, OSError):
+            return False
+        if any(part in self.skip_dirs or is_ignored_name(part) for part in parts):
+            return False
+        return self.max_depth is None or len(parts) <= self.max_depth
+
+    def upsert(self, path: str | Path) -> None:
+        rel = self._rel(path)
+        if rel is None:
+            return
+        full = self.root / rel
+        try:
+            if full.is_dir():
+                size, mtime_ns = dataset_stats(full)
+            else:
+                st = os.stat(full)
+                size, mtime_ns = st.st_size, st.st_mtime_ns
+        except OSError:
+            return self._delete(rel)
+        with self._lock, self._connect() as conn:
+            conn.execute(_UPSERT, (rel, Path(rel).suffix.lower(), size, mtime_ns))
+
+    def add_tree(self, path: str | Path) -> int:
+        """Walk one directory (e.g. moved in from outside the root) and upsert what it holds; returns entries seen."""
+        if not self._in_scope(path):
+            return 0
+        found = walk_subtree(self.root, path, self.exts, skip_dirs=self.skip_dirs, max_depth=self.max_depth)
+        with self._lock, self._connect() as conn:
+            conn.executemany(_UPSERT, [(e.rel, Path(e.rel).suffix.lower(), e.size, e.mtime_ns) for e in found])
+        return len(found)
+
+    def remove(self, path: str | Path, is_dir: bool = False) -> None:
+        try:
+            rel = Path(path).resolve().relative_to(self.root).as_posix()
+        except ValueError:
+            return
+        if dataset_root(rel, self.root) is not None:
+            return self.upsert(path)  # a part file or partition of a dataset: re-total the dataset
+        self._delete(rel, is_dir)
+
+    def _delete(self, rel: str, is_dir: bool = False) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM files WHERE path = ?", (rel,))
+            if is_dir:
+                conn.execute("DELETE FROM files WHERE path LIKE ? ESCAPE '\\'", (_prefix_like(rel),))
+
+    def rename(self, src: str | Path, dest: str | Path, is_dir: bool = False) -> None:
+        if not is_dir:
+            self.remove(src)
+            self.upsert(dest)
+            return
+        try:
+            old = Path(src).resolve().relative_to(self.root).as_posix()
+            new = Path(dest).resolve().relative_to(self.root).as_posix()
+        except ValueError:
+            return self.remove(src, is_dir=True)
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE files SET path = ? || substr(path, ?) WHERE path LIKE ? ESCAPE '\\'",
+                (new, len(old) + 1, _prefix_like(old)),
+            )
+            conn.execute("DELETE FROM files WHERE path = ?", (old,))
+        if self._rel(dest) is not None:
+            self.upsert(dest)  # a dataset folder (or a partition inside one) moved into place
+        else:
+            self.add_tree(dest)  # e.g. out of a skipped folder: its files were never catalogued
+
+    def set_shape(self, rel: str, n_rows: int, n_cols: int) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute("UPDATE files SET n_rows = ?, n_cols = ? WHERE path = ?", (n_rows, n_cols, rel))
+
+    def refresh(self, workers: int = 8) -> dict:
+        """Reconcile the catalog with one walk of the tree; returns added/updated/removed counts."""
+        found = walk_data_files(self.root, self.exts, skip_dirs=self.skip_dirs,
+                                max_depth=self.max_depth, workers=workers)
+        with self._lock, self._connect() as conn:
+            known = {p: (s, m) for p, s, m in conn.execute("SELECT path, size, mtime_ns FROM files")}
+            seen = {e.rel for e in found}
+            gone = [(p,) for p in known if p not in seen]
+            new = [(e.rel, Path(e.rel).suffix.lower(), e.size, e.mtime_ns) for e in found if e.rel not in known]
+            changed = [(e.size, e.mtime_ns, e.rel) for e in found
+                       if e.rel in known and known[e.rel] != (e.size, e.mtime_ns)]
+            conn.executemany("DELETE FROM files WHERE path = ?", gone)
+            conn.executemany("INSERT INTO files(path, ext, size, mtime_ns) VALUES (?, ?, ?, ?)", new)
+            conn.executemany(
+                "UPDATE files SET size = ?, mtime_ns = ?, n_rows = NULL, n_cols = NULL WHERE path = ?", changed)
+        return {"added": len(new), "updated": len(changed), "removed": len(gone)}
+
+    # ---------- Background watcher ----------
+    def start_watcher(self) -> str:
+        """Start (once) a daemon watcher; returns 'inotify' or 'polling'."""
+        if self._watcher is None:
+            self._watcher = _EventWatcher(self) if Observer is not None else _PollingWatcher(self)
+            self._watcher.start()
+        return self._watcher.kind
+
+    def stop_watcher(self) -> None:
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+
+def _prefix_like(rel_dir: str) -> str:
+    return rel_dir.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "/%"
+
+
+class _CatalogEventHandler(FileSystemEventHandler):
+    def __init__(self, catalog: FileCatalog):
+        self.catalog = catalog
+
+    def on_created(self, event):
+        if event.is_directory:
+            if self.catalog._rel(event.src_path) is not None:
+                self.catalog.upsert(event.src_path)  # a dataset folder or a new partition inside one
+            else:
+                # A tree moved in from outside the root arrives as one directory event; skipped,
+                # hidden and too-deep folders (.git, node_modules, ...) are ignored by add_tree.
+                self.catalog.add_tree(event.src_path)
+        else:
+            self.catalog.upsert(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.catalog.upsert(event.src_path)
+
+    def on_deleted(self, event):
+        self.catalog.remove(event.src_path, is_dir=event.is_directory)
+
+    def on_moved(self, event):
+        self.catalog.rename(event.src_path, event.dest_path, is_dir=event.is_directory)
+
+
+class _EventWatcher:
+    kind = "inotify"
+
+    def __init__(self, catalog: FileCatalog):
+        self.observer = Observer()
+        self.observer.daemon = True
+        self.observer.schedule(_CatalogEventHandler(catalog), str(catalog.root), recursive=True)
+
+    def start(self):
+        self.observer.start()
+
+    def stop(self):
+        self.observer.stop()
+
+
+class _PollingWatcher:
+    kind = "polling"
+
+    def __init__(self, catalog: FileCatalog, interval: float = POLL_SECONDS):
+        self.catalog = catalog
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="catalog-poller", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.catalog.refresh()
+            except Exception:
+                time.sleep(self.interval)  # root temporarily unavailable - try again later
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,188 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, NamedTuple
+
+# Directory names that never hold data we want to edit and are expensive to walk.
+DEFAULT_SKIP_DIRS = frozenset({
+    ".git", ".hg", ".svn", ".ipynb_checkpoints", "__pycache__", "node_modules",
+    ".venv", "venv", "env", ".tox", ".nox", ".mypy_cache", ".pytest_cache", ".ruff_cache",
+    "site-packages",
+})
+
+# Sidecar files written next to data files (csv_io schema sidecars) - never listed themselves.
+IGNORED_SUFFIXES = (".schema.json",)
+
+
+# Directories read as one Parquet dataset: "<name>.parquet/" folders (Spark/Dask style) and any
+# folder holding only Hive partitions ("col=value/") and part files. Listed, sized and opened as a unit.
+DATASET_SUFFIXES = (".parquet", ".pq")
+HIVE_SEGMENT = re.compile(r"[^=._][^=]*=.*")
+
+
+def is_ignored_name(name: str) -> bool:
+    """Sidecars and in-flight atomic_io temp files (".<stem>.<random>.tmp.<ext>") are never listed."""
+    name = name.lower()
+    return name.endswith(IGNORED_SUFFIXES) or (name.startswith(".") and ".tmp." in name)
+
+
+class FileEntry(NamedTuple):
+    rel: str          # posix path relative to the search root
+    size: int         # bytes
+    mtime_ns: int
+
+
+def _is_dataset_dir(path: str, entries: list[os.DirEntry]) -> bool:
+    if path.lower().endswith(DATASET_SUFFIXES):
+        return True
+    partitions = False
+    for e in entries:
+        if e.name.startswith((".", "_")):
+            continue  # _SUCCESS, _metadata, hidden files
+        try:
+            is_dir = e.is_dir(follow_symlinks=False)
+        except OSError:
+            return False
+        if is_dir and HIVE_SEGMENT.fullmatch(e.name):
+            partitions = True
+        elif is_dir or not e.name.lower().endswith(DATASET_SUFFIXES):
+            return False  # other folders or files live here too: list them one by one
+    return partitions
+
+
+def is_dataset_dir(path: str | Path) -> bool:
+    """True for a folder that opens as one Parquet dataset."""
+    try:
+        with os.scandir(path) as it:
+            return _is_dataset_dir(str(path), list(it))
+    except OSError:
+        return False
+
+
+def dataset_stats(path: str | Path) -> tuple[int, int]:
+    """(total bytes, newest mtime_ns) over a dataset directory's visible files and folders."""
+    size, mtime = 0, os.stat(path).st_mtime_ns
+    stack = [str(path)]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.name.startswith((".", "_")):
+                    continue  # hidden / _SUCCESS / in-flight temp files
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                    mtime = max(mtime, st.st_mtime_ns)
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        size += st.st_size
+                except OSError:
+                    continue
+    return size, mtime
+
+
+def dataset_root(rel: str, root: str | Path | None = None) -> str | None:
+    """
+    The dataset folder a relative posix path belongs to (the path itself when it is one), else None.
+
+    With root, a folder above a "col=value" segment only counts when it is a
+    dataset on disk (is_dataset_dir), as the walk decides.
+    """
+    parts = rel.split("/")
+    for i, part in enumerate(parts):
+        if i and HIVE_SEGMENT.fullmatch(part):
+            candidate = "/".join(parts[:i])
+            if root is None or is_dataset_dir(Path(root) / candidate):
+                return candidate
+            continue
+        if part.lower().endswith(DATASET_SUFFIXES) and i < len(parts) - 1:
+            return "/".join(parts[:i + 1])
+    return None
+
+
+def _walk_tree(root: str, start: str, depth: int, exts: frozenset, skip_dirs: frozenset,
+               max_depth: int | None, descend: bool = True) -> list[FileEntry]:
+    """Iterative scandir walk of one subtree; depth is the depth of `start` below root."""
+    found: list[FileEntry] = []
+    datasets = not exts.isdisjoint(DATASET_SUFFIXES)
+    stack = [(start, depth)]
+    while stack:
+        current, d = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = list(it)
+        except OSError:
+            continue  # permission denied, vanished, ...
+        if datasets and current != root and _is_dataset_dir(current, entries):
+            try:
+                size, mtime_ns = dataset_stats(current)
+            except OSError:
+                continue
+            found.append(FileEntry(os.path.relpath(current, root).replace(os.sep, "/"), size, mtime_ns))
+            continue
+        if max_depth is not None and d > max_depth:
+            continue  # one level past the limit is opened only to spot datasets
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if descend and entry.name not in skip_dirs and not is_ignored_name(entry.name):
+                        stack.append((entry.path, d + 1))
+                elif (os.path.splitext(entry.name)[1].lower() in exts
+                      and not is_ignored_name(entry.name)):
+                    st = entry.stat()
+                    rel = os.path.relpath(entry.path, root).replace(os.sep, "/")
+                    found.append(FileEntry(rel, st.st_size, st.st_mtime_ns))
+            except OSError:
+                continue
+    return found
+
+
+def walk_data_files(root_dir: str | Path, exts: Iterable[str], skip_dirs: Iterable[str] = DEFAULT_SKIP_DIRS,
+                    max_depth: int | None = None, workers: int = 0) -> list[FileEntry]:
+    """
+    Single-pass directory walk returning every file whose suffix is in `exts`.
+
+    Skips any directory named in `skip_dirs`, does not follow directory symlinks and
+    stops descending below `max_depth` (0 = root only). Parquet dataset folders
+    (see DATASET_SUFFIXES / HIVE_SEGMENT) come back as one entry when `exts`
+    includes a Parquet suffix. With workers > 1 each
+    top-level subdirectory is walked on its own thread, which pays off on network
+    volumes where stat() latency dominates. Results are sorted case-insensitively.
+    """
+    root = str(Path(root_dir).expanduser().resolve())
+    if not os.path.isdir(root):
+        return []
+    exts = frozenset(e.lower() for e in exts)
+    skip_dirs = frozenset(skip_dirs)
+
+    if workers <= 1:
+        results = _walk_tree(root, root, 0, exts, skip_dirs, max_depth)
+    else:
+        # Files directly under root are handled here; subtrees fan out to the pool.
+        results = _walk_tree(root, root, 0, exts, skip_dirs, max_depth, descend=False)
+        subdirs = []
+        try:
+            with os.scandir(root) as it:
+                subdirs = [e.path for e in it if e.name not in skip_dirs and not is_ignored_name(e.name)
+                           and e.is_dir(follow_symlinks=False)]
+        except OSError:
+            pass
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(lambda d: _walk_tree(root, d, 1, exts, skip_dirs, max_depth), subdirs):
+                results.extend(part)
+
+    results.sort(key=lambda e: e.rel.lower())
+    return results
+
+
+def walk_subtree(root_dir: str | Path, subdir: str | Path, exts: Iterable[str],
+                 skip_dirs: Iterable[str] = DEFAULT_SKIP_DIRS, max_depth: int | None = None) -> list[FileEntry]:
+    """walk_data_files limited to one directory under root_dir, with paths and depths still relative to root_dir."""
+    root = str(Path(root_dir).expanduser().resolve())
+    start = str(Path(subdir).expanduser().resolve())
+    depth = len(Path(os.path.relpath(start, root)).parts)
+    return _walk_tree(root, start, depth, frozenset(e.lower() for e in exts), frozenset(skip_dirs), max_depth)
@@ -0,0 +1,125 @@
+import io
+import json
+from itertools import islice
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.json as pajson
+
+from atomic_io import atomic_write, iter_slices
+
+try:  # optional fast parser for JSON arrays
+    import orjson
+except ImportError:
+    orjson = None
+
+NDJSON_EXTS = {".jsonl", ".ndjson"}
+JSON_EXTS = {".json"} | NDJSON_EXTS
+SNIFF_BYTES = 64 * 1024
+# Arrow splits NDJSON into blocks; a record must fit in one block.
+READ_OPTIONS = pajson.ReadOptions(block_size=16 << 20)
+
+
+def sniff_json(p: Path) -> str:
+    """
+    Guess the JSON layout from the first bytes: "array", "ndjson" or "object".
+
+    '[' means a single array of records. '{' is NDJSON when the first line is a
+    complete object on its own, otherwise one (pretty-printed) object.
+    """
+    p = Path(p)
+    if p.suffix.lower() in NDJSON_EXTS:
+        return "ndjson"
+    with open(p, "rb") as f:
+        head = f.read(SNIFF_BYTES)
+    text = head.lstrip(b"\xef\xbb\xbf \t\r\n")
+    if text.startswith(b"["):
+        return "array"
+    first_line = text.split(b"\n", 1)[0]
+    try:
+        return "ndjson" if isinstance(json.loads(first_line), dict) else "object"
+    except ValueError:
+        return "object"
+
+
+def read_json_fast(p: Path, backend: str = "auto") -> pd.DataFrame:
+    """
+    Load a JSON file with a single parse, choosing the reader from sniff_json().
+
+    NDJSON goes through pyarrow.json (multithreaded); arrays through orjson when
+    installed and backend is "auto"/"orjson", else pandas. backend="pandas"
+    forces pd.read_json for every layout.
+    """
+    kind = sniff_json(p)
+    if kind == "ndjson":
+        if backend == "pandas":
+            return pd.read_json(p, lines=True)
+        try:
+            return pajson.read_json(p, read_options=READ_OPTIONS).to_pandas()
+        except pa.ArrowInvalid:
+            return pd.read_json(p, lines=True)  # mixed types in a field - pandas widens to object
+    if kind == "array" and orjson is not None and backend in {"auto", "orjson"}:
+        return pd.DataFrame.from_records(orjson.loads(Path(p).read_bytes()))
+    return pd.read_json(p)
+
+
+def iter_ndjson(p: Path, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """
+    Stream an NDJSON file as DataFrames of at most chunk_rows records.
+
+    A block Arrow cannot parse against the schema it inferred (a field whose
+    type changes further down) switches the rest of the file to pandas.
+    """
+    done = 0
+    try:
+        for df in _iter_ndjson_arrow(p, chunk_rows):
+            done += len(df)
+            yield df
+    except pa.ArrowInvalid:
+        with pd.read_json(p, lines=True, chunksize=chunk_rows) as reader:
+            for df in reader:
+                if done >= len(df):
+                    done -= len(df)
+                    continue
+                yield df.iloc[done:]
+                done = 0
+
+
+def _iter_ndjson_arrow(p: Path, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    if hasattr(pajson, "open_json"):
+        # Arrow's streaming reader parses blocks on a thread pool.
+        for batch in pajson.open_json(p, read_options=READ_OPTIONS):
+            for start in range(0, batch.num_rows, chunk_rows):
+                yield batch.slice(start, chunk_rows).to_pandas()
+        return
+    with open(p, "rb") as f:
+        while True:
+            lines = [line for line in islice(f, chunk_rows) if line.strip()]
+            if not lines:
+                return
+            yield pajson.read_json(io.BytesIO(b"".join(lines)), read_options=READ_OPTIONS).to_pandas()
+
+
+def write_ndjson(df: pd.DataFrame, p: Path) -> None:
+    """Compact JSON Lines: one record per line, no indentation - cheap to write and to stream back."""
+    with atomic_write(p) as tmp, open(tmp, "w", encoding="utf-8") as f:
+        for part in iter_slices(df):
+            text = part.to_json(orient="records", lines=True, date_format="iso", force_ascii=False)
+            if text.strip():
+                f.write(text if text.endswith("\n") else text + "\n")
+
+
+def write_json_records(df: pd.DataFrame, p: Path) -> None:
+    """Pretty-printed JSON array of records, formatted in chunks and spliced into one array."""
+    with atomic_write(p) as tmp, open(tmp, "w", encoding="utf-8") as f:
+        f.write("[")
+        first = True
+        for part in iter_slices(df):
+            text = part.to_json(orient="records", indent=2, date_format="iso", force_ascii=False)
+            body = text.strip()[1:-1].strip("\n")  # drop this chunk's own [ ]
+            if body:
+                f.write(("\n" if first else ",\n") + body)
+                first = False
+        f.write("]" if first else "\n]")
@@ -0,0 +1,157 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, NamedTuple
+
+import pandas as pd
+
+from atomic_io import atomic_write
+
+# Per-folder record of what each sink last received; no data suffix, so the file browser never lists it.
+MANIFEST_NAME = ".data_editor_sinks"
+# Below this many rows a pure-Python encoder finishes before a spawned worker process has imported pandas.
+PROCESS_MIN_ROWS = 100_000
+
+
+@dataclass(frozen=True)
+class Sink:
+    name: str
+    target: Path
+    write: Callable[[pd.DataFrame, Path], object]  # top-level function (or partial) so it pickles
+    key: str = ""             # identity inside the target, e.g. the SQLite table
+    cpu_bound: bool = False   # pure-Python encoder (xlsxwriter): run in a process for large frames
+
+    @property
+    def manifest_key(self) -> str:
+        return f"{Path(self.target).resolve()}::{self.key}"
+
+
+class SinkResult(NamedTuple):
+    name: str
+    target: str
+    status: str               # "written", "skipped" (content unchanged) or "failed"
+    seconds: float
+    error: str | None = None
+
+
+@dataclass
+class PersistResult:
+    digest: str
+    rows: int
+    sinks: list[SinkResult] = field(default_factory=list)
+    seconds: float = 0.0      # wall clock for all sinks together
+
+    @property
+    def ok(self) -> bool:
+        return all(r.status != "failed" for r in self.sinks)
+
+    def by_status(self, status: str) -> list[SinkResult]:
+        return [r for r in self.sinks if r.status == status]
+
+    def summary(self) -> str:
+        parts = [f"{r.name} {r.status} in {r.seconds:.2f}s" + (f" ({r.error})" if r.error else "")
+                 for r in self.sinks]
+        return f"{self.rows:,} rows → " + ", ".join(parts) + f"; {self.seconds:.2f}s total"
+
+
+def frame_digest(df: pd.DataFrame) -> str:
+    """SHA-256 over column names, dtypes and a vectorized per-row hash - identical data gives an identical digest."""
+    h = hashlib.sha256()
+    h.update(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()]).encode())
+    try:
+        rows = pd.util.hash_pandas_object(df, index=False)
+    except TypeError:  # unhashable cells (lists, dicts): hash their text form instead
+        rows = pd.util.hash_pandas_object(df.astype(str), index=False)
+    h.update(rows.to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _stat(p: Path) -> list[int] | None:
+    try:
+        st = os.stat(p)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _read_manifest(p: Path) -> dict:
+    try:
+        return json.loads(p.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _timed_write(write: Callable, df: pd.DataFrame, target: Path) -> float:
+    start = time.perf_counter()
+    write(df, target)
+    return time.perf_counter() - start
+
+
+def write_sinks(df: pd.DataFrame, sinks: Iterable[Sink], workers: int | None = None,
+                skip_unchanged: bool = True, manifest: Path | None = None) -> PersistResult:
+    """
+    Write df to every sink concurrently; total latency is roughly that of the slowest sink.
+
+    Sinks run on a thread pool (Parquet/Arrow/SQLite encoders release the GIL);
+    cpu_bound sinks move to a spawned process when df has PROCESS_MIN_ROWS rows
+    or more and there is a second core to run it on. A sink is skipped when the manifest shows it already holds data
+    with the same frame_digest and its file is untouched since. One failing
+    sink does not stop the others; its error is reported in the result.
+    """
+    sinks = list(sinks)
+    start = time.perf_counter()
+    result = PersistResult(digest=frame_digest(df), rows=len(df))
+    if not sinks:
+        return result
+    manifest = Path(manifest) if manifest else Path(sinks[0].target).resolve().parent / MANIFEST_NAME
+    records = _read_manifest(manifest)
+
+    pending = []
+    for sink in sinks:
+        rec = records.get(sink.manifest_key)
+        if (skip_unchanged and rec and rec.get("digest") == result.digest
+                and rec.get("stat") == _stat(sink.target)):
+            result.sinks.append(SinkResult(sink.name, str(sink.target), "skipped", 0.0))
+        else:
+            pending.append(sink)
+
+    use_processes = (len(df) >= PROCESS_MIN_ROWS and (os.cpu_count() or 1) > 1
+                     and any(s.cpu_bound for s in pending))
+    # spawn, not fork: forking a process that already runs threads (Streamlit, watchers) can deadlock.
+    processes = (ProcessPoolExecutor(max_workers=sum(s.cpu_bound for s in pending),
+                                     mp_context=multiprocessing.get_context("spawn")) if use_processes else None)
+    try:
+        with ThreadPoolExecutor(max_workers=workers or len(pending) or 1) as threads:
+            futures = []
+            for sink in pending:
+                pool = processes if processes is not None and sink.cpu_bound else threads
+                futures.append((sink, pool.submit(_timed_write, sink.write, df, Path(sink.target))))
+            for sink, future in futures:
+                try:
+                    try:
+                        seconds = future.result()
+                    except BrokenProcessPool:  # e.g. a script without a __main__ guard: write in-process
+                        seconds = _timed_write(sink.write, df, Path(sink.target))
+                except Exception as e:
+                    result.sinks.append(SinkResult(sink.name, str(sink.target), "failed", 0.0, str(e)))
+                    records.pop(sink.manifest_key, None)
+                    continue
+                result.sinks.append(SinkResult(sink.name, str(sink.target), "written", seconds))
+                records[sink.manifest_key] = {"digest": result.digest, "stat": _stat(sink.target)}
+    finally:
+        if processes is not None:
+            processes.shutdown()
+
+    if pending:
+        with atomic_write(manifest) as tmp:
+            tmp.write_text(json.dumps(records, indent=2), encoding="utf-8")
+    order = {s.name: i for i, s in enumerate(sinks)}
+    result.sinks.sort(key=lambda r: order[r.name])
+    result.seconds = time.perf_counter() - start
+    return result
@@ -0,0 +1,308 @@
+import threading
+from itertools import chain
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from atomic_io import atomic_write
+from columnar_io import PARQUET_ROW_GROUP_ROWS, ExportProfile, resolve_profile
+from csv_io import write_sidecar
+from edit_delta import EditDelta, compute_delta
+from excel_io import write_excel_streaming
+
+# Formats with random access to row ranges (row groups / record batches).
+PAGED_EXTS = {".parquet", ".pq", ".feather", ".arrow", ".ipc"}
+# Formats save_paged can stream into one chunk at a time.
+PAGED_SAVE_FORMATS = {"parquet", "feather", "arrow", "csv", "json", "ndjson", "excel"}
+ROW_ID = "row_id"
+
+
+class PagedTable:
+    """
+    Lazy, row-addressable view of a Parquet or Arrow IPC/Feather file.
+
+    Only the row groups (Parquet) or record batches (IPC, memory-mapped) that
+    overlap the requested window are read, so memory is bounded by the page
+    size rather than the file size. A row's position in the file is its
+    stable row id. One instance is shared by every session (st.cache_resource);
+    the lock serializes reads and the lazily filled IPC batch offsets.
+    """
+
+    def __init__(self, p: Path):
+        self.path = Path(p)
+        self._lock = threading.Lock()
+        self.is_parquet = self.path.suffix.lower() in {".parquet", ".pq"}
+        if self.is_parquet:
+            self._pf = pq.ParquetFile(self.path)
+            self.schema = self._pf.schema_arrow
+            self.num_rows = self._pf.metadata.num_rows
+            self._n_chunks = self._pf.num_row_groups
+            sizes = [self._pf.metadata.row_group(i).num_rows for i in range(self._n_chunks)]
+            self._offsets = [0]
+            for n in sizes:
+                self._offsets.append(self._offsets[-1] + n)
+        else:
+            self._reader = ipc.open_file(pa.memory_map(str(self.path), "r"))
+            self.schema = self._reader.schema
+            self.num_rows = ds.dataset(self.path, format="ipc").count_rows()
+            self._n_chunks = self._reader.num_record_batches
+            # Batch sizes are not in the footer; discover them lazily (free when uncompressed).
+            self._offsets = [0]
+
+    def _chunk(self, i: int) -> pa.Table:
+        with self._lock:
+            if self.is_parquet:
+                return self._pf.read_row_group(i)
+            return pa.Table.from_batches([self._reader.get_batch(i)], schema=self.schema)
+
+    def _chunk_bounds(self, i: int) -> tuple[int, int]:
+        with self._lock:
+            while len(self._offsets) <= i + 1:
+                k = len(self._offsets) - 1
+                self._offsets.append(self._offsets[-1] + self._reader.get_batch(k).num_rows)
+            return self._offsets[i], self._offsets[i + 1]
+
+    def read_rows(self, start: int, stop: int) -> pa.Table:
+        """Rows [start, stop) as an Arrow table, touching only overlapping chunks."""
+        stop = min(stop, self.num_rows)
+        parts = []
+        for i in range(self._n_chunks):
+            lo, hi = self._chunk_bounds(i)
+            if hi <= start:
+                continue
+            if lo >= stop:
+                break
+            parts.append(self._chunk(i).slice(max(start - lo, 0), min(stop, hi) - max(start, lo)))
+        if not parts:
+            return self.schema.empty_table()
+        return pa.concat_tables(parts)
+
+    def page(self, page_no: int, page_size: int) -> pd.DataFrame:
+        start = page_no * page_size
+        stop = min(start + page_size, self.num_rows)
+        df = self.read_rows(start, stop).to_pandas()
+        df.index = pd.RangeIndex(start, start + len(df), name=ROW_ID)
+        return df
+
+    def num_pages(self, page_size: int) -> int:
+        return max(1, -(-self.num_rows // page_size))
+
+    def iter_chunks(self) -> Iterator[tuple[int, pa.Table]]:
+        """(first row id, table) for every row group / record batch, in file order."""
+        for i in range(self._n_chunks):
+            lo, _ = self._chunk_bounds(i)
+            yield lo, self._chunk(i)
+
+    def close(self) -> None:
+        if self.is_parquet:
+            self._pf.close()
+        self._reader = None
+
+
+class SharedTable(PagedTable):
+    """
+    PagedTable over a whole file already in memory as one Arrow table.
+
+    For formats without random access (CSV, JSON, Excel). Built once per file
+    version and shared by every session: the table is immutable, a page is a
+    zero-copy slice converted to pandas on its own, and each session's edits
+    live in its PageOverlay - so memory grows with edits, not with sessions
+    times file size.
+    """
+
+    def __init__(self, table: pa.Table, p: Path, chunk_rows: int = PARQUET_ROW_GROUP_ROWS):
+        self.path = Path(p)
+        self.is_parquet = False
+        self.table = table
+        self.schema = table.schema
+        self.num_rows = table.num_rows
+        self._chunk_rows = chunk_rows
+
+    def read_rows(self, start: int, stop: int) -> pa.Table:
+        return self.table.slice(start, max(min(stop, self.num_rows) - start, 0))
+
+    def iter_chunks(self) -> Iterator[tuple[int, pa.Table]]:
+        for lo in range(0, self.num_rows, self._chunk_rows):
+            yield lo, self.table.slice(lo, self._chunk_rows)
+
+    def close(self) -> None:
+        pass  # shared with other sessions; dropped with its cache entry
+
+
+class PageOverlay:
+    """
+    Pending edits for a PagedTable (or SqliteTable), keyed by stable row id.
+
+    cells maps row id -> {column: new value}; deleted holds removed row ids;
+    inserted keeps new rows per page (by page start) so re-recording a page
+    replaces rather than duplicates them.
+    """
+
+    def __init__(self):
+        self.cells: dict[int, dict[str, object]] = {}
+        self.deleted: set[int] = set()
+        self.inserted: dict[int, pd.DataFrame] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.cells or self.deleted or any(len(df) for df in self.inserted.values()))
+
+    def summary(self) -> str:
+        n_cells = sum(len(v) for v in self.cells.values())
+        n_new = sum(len(df) for df in self.inserted.values())
+        return f"{n_cells:,} cell edit(s), {len(self.deleted):,} deleted row(s), {n_new:,} new row(s)"
+
+    def apply(self, raw_page: pd.DataFrame) -> pd.DataFrame:
+        """raw_page with this overlay's edits, deletions and insertions applied."""
+        df = raw_page.drop(index=[r for r in raw_page.index if r in self.deleted])
+        for rid in df.index.intersection(list(self.cells)):
+            for col, val in self.cells[rid].items():
+                _set_cell(df, rid, col, val)
+        new = self.inserted.get(_page_start(raw_page.index))
+        if new is not None and len(new):
+            new = new.copy()
+            # Negative labels keep new rows distinguishable from real row ids.
+            new.index = pd.Index(range(-1, -len(new) - 1, -1), name=ROW_ID)
+            df = pd.concat([df, new])
+        return df
+
+    def record(self, raw_page: pd.DataFrame, edited: pd.DataFrame) -> None:
+        """Replace this page's pending edits with the diff between raw_page and the editor output."""
+        page_ids = raw_page.index
+        for rid in page_ids:
+            self.cells.pop(rid, None)
+            self.deleted.discard(rid)
+
+        delta = compute_delta(raw_page, edited)
+        self.deleted.update(delta.deleted)
+        self.cells.update(delta.changed)
+
+        start = _page_start(page_ids)
+        if len(delta.inserted):
+            self.inserted[start] = delta.inserted.reset_index(drop=True)
+        else:
+            self.inserted.pop(start, None)
+
+    def to_delta(self) -> EditDelta:
+        """All pages' pending edits as one EditDelta (for sinks patched by row key, e.g. SQLite)."""
+        new = [df for _, df in sorted(self.inserted.items()) if len(df)]
+        return EditDelta(changed=dict(self.cells), deleted=sorted(self.deleted),
+                         inserted=pd.concat(new, ignore_index=True) if new else pd.DataFrame())
+
+    def touches(self, first_row: int, n_rows: int) -> bool:
+        stop = first_row + n_rows
+        return any(first_row <= r < stop for r in self.cells) or any(first_row <= r < stop for r in self.deleted)
+
+    def merge_chunk(self, first_row: int, table: pa.Table) -> pd.DataFrame:
+        """Apply the overlay to one row group / batch of the source file."""
+        df = table.to_pandas()
+        df.index = pd.RangeIndex(first_row, first_row + len(df))
+        ids = [r for r in self.cells if first_row <= r < first_row + len(df)]
+        for rid in ids:
+            for col, val in self.cells[rid].items():
+                _set_cell(df, rid, col, val)
+        return df.drop(index=[r for r in self.deleted if first_row <= r < first_row + len(df)])
+
+
+def _set_cell(df: pd.DataFrame, rid, col, val) -> None:
+    """df.at assignment that widens the column to object instead of failing (or silently casting) on a misfit."""
+    try:
+        df.at[rid, col] = val
+    except (TypeError, ValueError):
+        df[col] = df[col].astype(object)
+        df.at[rid, col] = val
+
+
+def _page_start(index: pd.Index):
+    if isinstance(index, pd.RangeIndex):
+        return int(index.start)
+    return index.min() if len(index) else 0
+
+
+def _paged_batches(table: PagedTable, overlay: PageOverlay, schema: pa.Schema) -> Iterator[pa.Table]:
+    """The source's chunks with the overlay merged in, every one cast to schema."""
+    # Untouched chunks stay Arrow tables; only edited ones go through pandas.
+    chunks = (overlay.merge_chunk(lo, t) if overlay.touches(lo, t.num_rows) else t.replace_schema_metadata()
+              for lo, t in table.iter_chunks())
+    tail = [df for _, df in sorted(overlay.inserted.items()) if len(df)]
+    for df in chain(chunks, tail):
+        if isinstance(df, pa.Table):
+            yield df
+            continue
+        try:
+            yield pa.Table.from_pandas(df, preserve_index=False).cast(schema)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+            # e.g. 2.7 typed into an integer column: refuse rather than truncate it to 2.
+            raise ValueError(f"An edited value does not fit the file's column type ({e}). "
+                             "Fix the value, or load the file without paged mode to change "
+                             "column types.") from e
+
+
+def save_paged(table: PagedTable, overlay: PageOverlay, out: Path, fmt: str,
+               profile: ExportProfile | str = "balanced") -> int:
+    """
+    Stream the source file through the overlay into `out` (one of PAGED_SAVE_FORMATS).
+
+    Parquet/IPC output uses the export profile's codec and encoding settings;
+    its sort_by is ignored because rows are never all in memory at once.
+
+    Works one row group / batch at a time and writes to a temp file that is
+    renamed over `out`, so saving onto the source file is safe. table is left
+    open (other sessions may be reading it); the caller drops it from its
+    cache. Returns rows written.
+    """
+    if fmt not in PAGED_SAVE_FORMATS:
+        raise ValueError(f"Paged mode cannot save as {fmt}")
+    out = Path(out)
+    profile = resolve_profile(profile, sort_by=())
+    schema = table.schema.remove_metadata()
+    if fmt == "excel":
+        return write_excel_streaming((b.to_pandas() for b in _paged_batches(table, overlay, schema)), out)["rows"]
+    written = 0
+    writer = f = None
+    with atomic_write(out) as tmp:
+        try:
+            for batch in _paged_batches(table, overlay, schema):
+                if fmt == "parquet":
+                    writer = writer or pq.ParquetWriter(tmp, schema, **profile.parquet_options(schema))
+                    writer.write_table(batch, row_group_size=profile.row_group_rows)
+                elif fmt in {"feather", "arrow"}:
+                    writer = writer or ipc.new_file(str(tmp), schema, options=profile.ipc_options())
+                    writer.write_table(batch)
+                else:
+                    df = batch.to_pandas()
+                    f = f or open(tmp, "w", newline="", encoding="utf-8")
+                    if fmt == "csv":
+                        df.to_csv(f, header=written == 0, index=False)
+                    elif fmt == "ndjson":
+                        text = df.to_json(orient="records", lines=True, date_format="iso", force_ascii=False)
+                        if text.strip():
+                            f.write(text if text.endswith("\n") else text + "\n")
+                    else:  # json: each chunk's records spliced into one array, as write_json_records does
+                        body = df.to_json(orient="records", indent=2, date_format="iso",
+                                          force_ascii=False).strip()[1:-1].strip("\n")
+                        if body:
+                            f.write(("[\n" if written == 0 else ",\n") + body)
+                written += batch.num_rows
+            if writer is None and fmt in {"parquet", "feather", "arrow"}:
+                writer = (pq.ParquetWriter(tmp, schema, **profile.parquet_options(schema)) if fmt == "parquet"
+                          else ipc.new_file(str(tmp), schema, options=profile.ipc_options()))
+            if fmt == "json":
+                f = f or open(tmp, "w", encoding="utf-8")
+                f.write("\n]" if written else "[]")
+            elif fmt in {"csv", "ndjson"} and f is None:
+                f = open(tmp, "w", newline="", encoding="utf-8")
+                if fmt == "csv":
+                    schema.empty_table().to_pandas().to_csv(f, index=False)
+        finally:
+            if writer is not None:
+                writer.close()
+            if f is not None:
+                f.close()
+    if fmt == "csv":
+        write_sidecar(schema.empty_table().to_pandas(), out)
+    return written
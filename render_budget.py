@@ -0,0 +1,93 @@
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+# Cells longer than this are shown cut short (full values stay on the server).
+TRUNCATE_CHARS = 200
+# Rough cap on the Arrow payload sent to the browser on every render of the grid.
+RENDER_BUDGET_BYTES = 16 * 1024 * 1024
+ELLIPSIS = "…"
+
+
+@dataclass
+class RenderPlan:
+    """What the grid shows of a frame: hidden columns are left out, truncated ones are cut and read-only."""
+    hidden: list[str] = field(default_factory=list)        # by the user plus auto_hidden
+    auto_hidden: list[str] = field(default_factory=list)   # dropped to get under the budget
+    truncated: list[str] = field(default_factory=list)
+    max_chars: int = TRUNCATE_CHARS
+    payload_bytes: int = 0                                  # estimate for the columns shown
+
+    @property
+    def active(self) -> bool:
+        return bool(self.hidden or self.truncated)
+
+
+def _is_text(s: pd.Series) -> bool:
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return False
+    if pd.api.types.is_string_dtype(s.dtype) and s.dtype != object:
+        return True
+    return s.dtype == object and pd.api.types.infer_dtype(s, skipna=True) in {"string", "empty"}
+
+
+def column_payload(s: pd.Series) -> int:
+    """Approximate Arrow bytes for s: text length plus offsets for strings, buffer size for the rest."""
+    if _is_text(s):
+        return int(s.str.len().sum()) + 4 * len(s)
+    return int(s.memory_usage(index=False, deep=s.dtype == object))
+
+
+def truncate_text(s: pd.Series, max_chars: int) -> pd.Series:
+    """Strings longer than max_chars cut to max_chars with an ellipsis; other cells unchanged."""
+    long = s.str.len() > max_chars
+    return s.where(~long, s.str.slice(0, max_chars) + ELLIPSIS)
+
+
+def plan_render(df: pd.DataFrame, hidden=(), max_chars: int = TRUNCATE_CHARS,
+                budget_bytes: int = RENDER_BUDGET_BYTES) -> tuple[pd.DataFrame, RenderPlan]:
+    """
+    The frame to hand to st.data_editor, and the plan to undo it with (merge_back).
+
+    Text columns with cells over max_chars (0 = never) are truncated. If the
+    shown columns still exceed budget_bytes, the heaviest are hidden until the
+    estimate fits, keeping at least one column. Frames whose index is not
+    unique are shown whole, since hidden values could not be matched back.
+    """
+    if not df.index.is_unique:
+        return df, RenderPlan(payload_bytes=sum(column_payload(df[c]) for c in df.columns))
+    plan = RenderPlan(hidden=[c for c in df.columns if c in set(hidden)], max_chars=max_chars)
+    shown = {c: df[c] for c in df.columns if c not in plan.hidden}
+    sizes = {}
+    for col, s in shown.items():
+        if max_chars and _is_text(s) and (s.str.len() > max_chars).any():
+            shown[col] = truncate_text(s, max_chars)
+            plan.truncated.append(col)
+        sizes[col] = column_payload(shown[col])
+    for col in sorted(sizes, key=sizes.get, reverse=True):
+        if sum(sizes.values()) <= budget_bytes or len(sizes) == 1:
+            break
+        del shown[col], sizes[col]
+        plan.auto_hidden.append(col)
+    plan.hidden += plan.auto_hidden
+    plan.truncated = [c for c in plan.truncated if c in shown]
+    plan.payload_bytes = sum(sizes.values())
+    if not plan.active:
+        return df, plan
+    return pd.DataFrame(shown, index=df.index), plan
+
+
+def merge_back(full: pd.DataFrame, edited: pd.DataFrame, plan: RenderPlan) -> pd.DataFrame:
+    """
+    edited (the grid output) with hidden and truncated columns restored from full.
+
+    Rows are matched on index labels, so edits, deletions and new rows in the
+    grid are kept; restored cells of new rows are missing. Columns come back
+    in full's order.
+    """
+    if not plan.active:
+        return edited
+    restore = [c for c in full.columns if c in plan.hidden or c in plan.truncated]
+    base = full[restore].reindex(edited.index)
+    out = pd.concat([edited.drop(columns=plan.truncated), base], axis=1)
+    return out[list(full.columns)]
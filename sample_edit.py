@@ -0,0 +1,335 @@
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from atomic_io import atomic_write
+from chunked_io import DEFAULT_CHUNK_ROWS, iter_df
+from columnar_io import PARQUET_EXTS, ExportProfile, resolve_profile
+from csv_io import write_sidecar
+from edit_delta import compute_delta
+from excel_io import write_excel_streaming
+from paged_editor import ROW_ID
+
+SAMPLE_ROWS = 10_000
+SAMPLE_METHODS = ["uniform", "row_groups", "stratified"]
+RULE_KINDS = ["replace", "set", "delete"]
+# How grid edits of the sample become rules: on the edited rows only, or on every row holding the old value.
+EDIT_SCOPES = ["row", "value"]
+# Formats the rules can be streamed into, one chunk at a time.
+STREAM_FORMATS = {"parquet", "feather", "arrow", "csv", "ndjson", "excel"}
+_KEY = "__sample_key"
+_COMPARE = {"==": "eq", "!=": "ne", "<": "lt", "<=": "le", ">": "gt", ">=": "ge"}
+
+
+def sample_row_groups(p: Path, n_rows: int, seed: int | None = None) -> pd.DataFrame:
+    """
+    About n_rows rows of a Parquet file read from randomly chosen row groups only.
+
+    Whole groups are drawn until they hold n_rows rows, then thinned to n_rows.
+    Cheap however large the file, but clustered: rows of a file sorted on some
+    column come from a few stretches of it (use reservoir_sample for those).
+    """
+    rng = np.random.default_rng(seed)
+    with pq.ParquetFile(p) as pf:
+        sizes = [pf.metadata.row_group(i).num_rows for i in range(pf.num_row_groups)]
+        starts = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(int)
+        picked, total = [], 0
+        for i in rng.permutation(len(sizes)).tolist():
+            if total >= n_rows:
+                break
+            picked.append(i)
+            total += sizes[i]
+        picked.sort()
+        df = pf.read_row_groups(picked).to_pandas() if picked else pf.schema_arrow.empty_table().to_pandas()
+    df.index = pd.Index(np.concatenate([np.arange(starts[i], starts[i] + sizes[i]) for i in picked])
+                        if picked else [], dtype="int64", name=ROW_ID)
+    if len(df) > n_rows:
+        df = df.sample(n_rows, random_state=seed).sort_index()
+    return df
+
+
+def _stratum_cap(sizes: np.ndarray, n_rows: int) -> int:
+    """Largest per-stratum count c with sum(min(size, c)) <= n_rows: small strata whole, the rest c rows each."""
+    remaining, sizes = n_rows, np.sort(sizes)
+    for i, size in enumerate(sizes.tolist()):
+        if size * (len(sizes) - i) > remaining:
+            return remaining // (len(sizes) - i)
+        remaining -= size
+    return int(sizes[-1]) if len(sizes) else 0
+
+
+def _take_strata(pool: pd.DataFrame, strata: str, n_rows: int, final: bool) -> pd.DataFrame:
+    """
+    The rows of pool that can still make the stratified sample.
+
+    Each stratum keeps its cap smallest keys, plus one spare row while
+    streaming: more rows only lower the cap, so nothing dropped is needed
+    later. The final pick hands the n_rows - total leftover to the spare
+    rows with the smallest keys.
+    """
+    groups = pool.groupby(strata, dropna=False, observed=True, sort=False)
+    rank = groups[_KEY].rank(method="first")
+    cap = _stratum_cap(groups.size().to_numpy(), n_rows)
+    if not final:
+        return pool[rank <= cap + 1]
+    base = pool[rank <= cap]
+    return pd.concat([base, pool[rank == cap + 1].nsmallest(n_rows - len(base), _KEY)])
+
+
+def reservoir_sample(chunks: Iterable[pd.DataFrame], n_rows: int, seed: int | None = None,
+                     strata: str | None = None) -> pd.DataFrame:
+    """
+    Uniform sample without replacement of n_rows rows in one pass over chunks.
+
+    Every row gets a random key and the n_rows smallest keys survive, so memory
+    holds one chunk plus the sample. With strata the n_rows are shared out
+    evenly over its values (strata smaller than their share are taken whole).
+    Rows are labelled with their position in the stream (row_id) and come back
+    in that order.
+    """
+    rng = np.random.default_rng(seed)
+    kept, first = None, 0
+    for chunk in chunks:
+        n = len(chunk)
+        chunk = chunk.set_axis(pd.RangeIndex(first, first + n, name=ROW_ID)).assign(**{_KEY: rng.random(n)})
+        first += n
+        pool = chunk if kept is None else pd.concat([kept, chunk])
+        kept = _take_strata(pool, strata, n_rows, final=False) if strata else pool.nsmallest(n_rows, _KEY)
+    if kept is None:
+        return pd.DataFrame()
+    if strata:
+        kept = _take_strata(kept, strata, n_rows, final=True)
+    return kept.drop(columns=_KEY).sort_index()
+
+
+def load_sample(p: Path, n_rows: int = SAMPLE_ROWS, method: str = "uniform", strata: str | None = None,
+                seed: int | None = 0, sqlite_table: str | None = None, sheet_name: str | None = None,
+                chunk_rows: int = DEFAULT_CHUNK_ROWS) -> pd.DataFrame:
+    """Sample of any file iter_df can stream; "row_groups" only reads part of a Parquet file, else a full pass."""
+    if method not in SAMPLE_METHODS:
+        raise ValueError(f"Unknown sampling method: {method!r} (choose from {', '.join(SAMPLE_METHODS)})")
+    p = Path(p)
+    if method == "row_groups" and p.is_file() and p.suffix.lower() in PARQUET_EXTS:
+        return sample_row_groups(p, n_rows, seed)
+    if method == "stratified" and not strata:
+        raise ValueError("Stratified sampling needs a column to stratify by.")
+    chunks = iter_df(p, chunk_rows, sqlite_table=sqlite_table, sheet_name=sheet_name)
+    return reservoir_sample(chunks, n_rows, seed, strata if method == "stratified" else None)
+
+
+def filter_mask(df: pd.DataFrame, filters: Iterable[tuple]) -> np.ndarray:
+    """
+    Rows matching every (column, op, value) tuple (build_filter's DNF form); missing values never match.
+
+    A filter on the index's name (row_id) tests the index itself.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    for col, op, value in filters:
+        s = df[col] if col in df.columns or col != df.index.name else pd.Series(df.index, index=df.index)
+        if op in {"in", "not in"}:
+            m = s.isin(list(value))
+            m = ~m & s.notna() if op == "not in" else m
+        else:
+            m = getattr(s, _COMPARE[op])(value)
+        mask &= m.fillna(False).to_numpy(dtype=bool)
+    return mask
+
+
+@dataclass(frozen=True)
+class EditRule:
+    """
+    A declarative edit that can be applied to any chunk of a file on its own.
+
+    "replace" swaps old for value in column, "set" writes value into column and
+    "delete" drops rows; each only where every `where` filter (build_filter
+    tuples) matches.
+    """
+    kind: str
+    column: str | None = None
+    value: object = None
+    old: object = None
+    where: tuple[tuple, ...] = ()
+
+    def __post_init__(self):
+        if self.kind not in RULE_KINDS:
+            raise ValueError(f"Unknown rule: {self.kind!r} (choose from {', '.join(RULE_KINDS)})")
+        if self.kind == "delete" and not self.where:
+            raise ValueError("A delete rule needs a condition.")
+        if self.kind != "delete" and self.column is None:
+            raise ValueError(f"A {self.kind} rule needs a column.")
+
+    def describe(self) -> str:
+        cond = " and ".join(f"{c} {op} {_show(v)}" for c, op, v in self.where)
+        if self.kind == "delete":
+            return f"delete rows where {cond}"
+        text = (f"replace {_show(self.old)} with {_show(self.value)} in {self.column}" if self.kind == "replace"
+                else f"set {self.column} = {_show(self.value)}")
+        return text + (f" where {cond}" if cond else "")
+
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        mask = filter_mask(df, self.where)
+        if self.kind == "replace":
+            s = df[self.column]
+            hit = s.isna() if pd.isna(self.old) else s.eq(self.old).fillna(False)
+            mask &= hit.to_numpy(dtype=bool)
+        return mask
+
+    def apply(self, df: pd.DataFrame) -> tuple[pd.DataFrame, int]:
+        """df with the rule applied, and the number of rows it touched."""
+        mask = self.mask(df)
+        n = int(mask.sum())
+        if not n:
+            return df, 0
+        if self.kind == "delete":
+            return df[~mask], n
+        s = df[self.column]
+        try:
+            new = s.mask(mask, self.value)
+        except (TypeError, ValueError):  # e.g. a value outside a categorical's categories
+            new = s.astype(object).mask(mask, self.value)
+        return df.assign(**{self.column: new}), n
+
+
+def _show(v) -> str:
+    if isinstance(v, (list, tuple)) and len(v) > 5:
+        return f"({', '.join(map(_show, v[:5]))}, … {len(v):,} values)"
+    return repr(v) if isinstance(v, str) else "missing" if v is None else str(v)
+
+
+def apply_rules(df: pd.DataFrame, rules: Iterable[EditRule]) -> tuple[pd.DataFrame, list[int]]:
+    """df with rules applied in order, and the rows each one touched."""
+    counts = []
+    for rule in rules:
+        df, n = rule.apply(df)
+        counts.append(n)
+    return df, counts
+
+
+def rules_from_edits(sample: pd.DataFrame, edited: pd.DataFrame,
+                     scope: str = "row") -> tuple[list[EditRule], list[str]]:
+    """
+    The sample's cell edits as rules, plus notes on what could not be captured.
+
+    The sample's index is each row's position in the file (row_id). With
+    scope "row", cells set to the same value in a column become one "set c = b
+    where row_id in (...)" rule and deleted rows one delete rule, so only the
+    edited rows of the file change. With scope "value", changing a from a to b
+    in c becomes "replace a with b in c" for every row of the file holding a
+    (the last edit wins when one value was edited to different values), and
+    deleted rows are left out. Added rows have no position in the file and are
+    never applied.
+    """
+    if scope not in EDIT_SCOPES:
+        raise ValueError(f"Unknown scope: {scope!r} (choose from {', '.join(EDIT_SCOPES)})")
+    delta = compute_delta(sample, edited)
+    if delta.needs_rewrite:
+        return [], ["The sample's columns changed; only cell edits can become rules."]
+    notes = []
+    if scope == "row":
+        targets: dict[tuple, list] = {}
+        for rid in sorted(delta.changed):
+            for col, new in delta.changed[rid].items():
+                value = None if pd.isna(new) else new
+                # Keyed on the type too, so 1 and True (equal and same hash) stay apart.
+                targets.setdefault((col, type(value), value), []).append(int(rid))
+        rules = [EditRule("set", column=col, value=value, where=((ROW_ID, "in", tuple(rids)),))
+                 for (col, _, value), rids in targets.items()]
+        if delta.deleted:
+            rules.append(EditRule("delete", where=((ROW_ID, "in", tuple(sorted(map(int, delta.deleted)))),)))
+    else:
+        mapping: dict[tuple, object] = {}
+        for rid in sorted(delta.changed):
+            for col, new in delta.changed[rid].items():
+                old = sample.at[rid, col]
+                key = (col, None if pd.isna(old) else old)
+                if key in mapping and not _same(mapping[key], new):
+                    notes.append(f"{old!r} in {col} was edited to different values; using {new!r}.")
+                mapping[key] = new
+        rules = [EditRule("replace", column=col, old=old, value=new) for (col, old), new in mapping.items()]
+        if delta.deleted:
+            notes.append(f"{len(delta.deleted):,} deleted sample row(s) are not applied to the file; "
+                         "use a delete rule to remove rows.")
+    if len(delta.inserted):
+        notes.append(f"{len(delta.inserted):,} added sample row(s) are not applied to the file.")
+    return rules, notes
+
+
+def _same(a, b) -> bool:
+    if pd.api.types.is_scalar(a) and pd.api.types.is_scalar(b) and pd.isna(a) and pd.isna(b):
+        return True
+    return bool(a == b) if pd.api.types.is_scalar(a) else False
+
+
+def _write_chunks(chunks: Iterator[pd.DataFrame], out: Path, fmt: str, profile: ExportProfile) -> None:
+    """Stream DataFrame chunks into out; columnar output takes its schema from the first chunk."""
+    if fmt == "excel":
+        write_excel_streaming(chunks, out)
+        return
+    first = None
+    with atomic_write(out) as tmp:
+        writer = f = None
+        try:
+            for df in chunks:
+                if first is None:
+                    first = df.iloc[:0]
+                if fmt in {"parquet", "feather", "arrow"}:
+                    if writer is None:
+                        schema = pa.Schema.from_pandas(df, preserve_index=False).remove_metadata()
+                        writer = (pq.ParquetWriter(tmp, schema, **profile.parquet_options(schema)) if fmt == "parquet"
+                                  else ipc.new_file(str(tmp), schema, options=profile.ipc_options()))
+                    writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+                else:
+                    f = f or open(tmp, "w", newline="", encoding="utf-8")
+                    if fmt == "csv":
+                        df.to_csv(f, header=f.tell() == 0, index=False)
+                    else:
+                        text = df.to_json(orient="records", lines=True, date_format="iso", force_ascii=False)
+                        if text.strip():
+                            f.write(text if text.endswith("\n") else text + "\n")
+        finally:
+            if writer is not None:
+                writer.close()
+            if f is not None:
+                f.close()
+        if first is None:
+            raise ValueError("The source has no rows to write.")
+    if fmt == "csv":
+        write_sidecar(first, out)
+
+
+def apply_rules_streaming(p: Path, rules: list[EditRule], out: Path, fmt: str,
+                          profile: ExportProfile | str = "balanced", chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                          sqlite_table: str | None = None, sheet_name: str | None = None) -> dict:
+    """
+    Apply rules to every row of p in one streaming pass and write the result to out.
+
+    Memory holds one chunk of chunk_rows rows however large p is; out is built
+    in a temp file and renamed into place, so out may be p itself. Returns
+    rows_in, rows_out, affected (rows touched per rule) and seconds.
+    """
+    if fmt not in STREAM_FORMATS:
+        raise ValueError(f"Rules can be streamed into {', '.join(sorted(STREAM_FORMATS))} only")
+    start = time.perf_counter()
+    stats = {"rows_in": 0, "rows_out": 0, "affected": [0] * len(rules)}
+
+    def edited_chunks() -> Iterator[pd.DataFrame]:
+        for chunk in iter_df(p, chunk_rows, sqlite_table=sqlite_table, sheet_name=sheet_name):
+            # Label rows with their position in the file, as load_sample does, for row_id filters.
+            first = stats["rows_in"]
+            chunk = chunk.set_axis(pd.RangeIndex(first, first + len(chunk), name=ROW_ID))
+            stats["rows_in"] += len(chunk)
+            chunk, counts = apply_rules(chunk, rules)
+            stats["affected"] = [a + n for a, n in zip(stats["affected"], counts)]
+            stats["rows_out"] += len(chunk)
+            yield chunk
+
+    _write_chunks(edited_chunks(), Path(out), fmt, resolve_profile(profile, sort_by=()))
+    stats["seconds"] = time.perf_counter() - start
+    return stats
@@ -0,0 +1,141 @@
+import os
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+import pyarrow.dataset as ds
+
+from atomic_io import atomic_write
+from columnar_io import IPC_EXTS, PARQUET_EXTS, open_dataset
+from file_scanner import is_ignored_name
+from json_io import JSON_EXTS
+from sqlite_io import SQLITE_EXTS, quote_ident
+
+try:  # optional SQL engine for querying files in place
+    import duckdb
+except ImportError:
+    duckdb = None
+
+HAS_DUCKDB = duckdb is not None
+SOURCE_VIEW = "src"      # the selected file (or table of the selected database)
+GLOB_VIEW = "files"      # every file matching the glob, unioned by column name
+QUERY_EXTS = PARQUET_EXTS | IPC_EXTS | {".csv", ".txt"} | JSON_EXTS | SQLITE_EXTS
+# Where DuckDB spills joins/sorts/aggregates that outgrow its memory limit.
+SPILL_DIR = Path(tempfile.gettempdir()) / "data_editor_duckdb"
+EXPORT_FORMATS = {"parquet": "(FORMAT parquet, COMPRESSION zstd)", "csv": "(FORMAT csv, HEADER)",
+                  "ndjson": "(FORMAT json)", "json": "(FORMAT json, ARRAY true)"}
+
+
+def _literal(s) -> str:
+    return "'" + str(s).replace("'", "''") + "'"
+
+
+def _file_list(paths: list[Path]) -> str:
+    return "[" + ", ".join(_literal(p.as_posix()) for p in paths) + "]"
+
+
+def _scan(paths: list[Path]) -> str | ds.Dataset:
+    """DuckDB table function for files of one kind, or an Arrow dataset DuckDB scans lazily (IPC)."""
+    kinds = {".csv" if p.suffix.lower() == ".txt" else p.suffix.lower() for p in paths}
+    if kinds <= PARQUET_EXTS:
+        return f"read_parquet({_file_list(paths)}, union_by_name = true)"
+    if kinds <= {".csv"}:
+        return f"read_csv({_file_list(paths)}, union_by_name = true)"
+    if kinds <= JSON_EXTS:
+        return f"read_json_auto({_file_list(paths)}, union_by_name = true)"
+    if kinds <= IPC_EXTS:
+        return ds.dataset([str(p) for p in paths], format="ipc")
+    raise ValueError(f"Cannot query {', '.join(sorted(kinds))} files together")
+
+
+def _create_view(conn, name: str, source) -> None:
+    if isinstance(source, str):
+        conn.execute(f"CREATE VIEW {quote_ident(name)} AS SELECT * FROM {source}")
+    else:
+        conn.register(name, source)
+
+
+def glob_files(root: Path, pattern: str) -> list[Path]:
+    """Data files under root matching pattern (e.g. "sales/**/*.parquet"), skipping sidecars and temp files."""
+    return sorted(p for p in Path(root).glob(pattern)
+                  if p.is_file() and p.suffix.lower() in QUERY_EXTS - SQLITE_EXTS and not is_ignored_name(p.name))
+
+
+@contextmanager
+def query_connection(source: Path | None = None, sqlite_table: str | None = None, root: Path | None = None,
+                     pattern: str = "", threads: int | None = None) -> Iterator["duckdb.DuckDBPyConnection"]:
+    """
+    In-memory DuckDB connection with the data exposed as views; nothing is loaded up front.
+
+    The selected file becomes `src`; a SQLite database is attached read-only
+    as `db` and `src` is its selected table (read in full when DuckDB's sqlite
+    extension is unavailable). Files under root matching pattern become
+    `files`. DuckDB reads only the columns and row groups a query needs, runs
+    on all cores and spills to SPILL_DIR instead of running out of memory.
+    """
+    if duckdb is None:
+        raise RuntimeError("SQL queries need the duckdb package (pip install duckdb).")
+    SPILL_DIR.mkdir(parents=True, exist_ok=True)
+    conn = duckdb.connect(config={"threads": threads or os.cpu_count() or 1,
+                                  "temp_directory": str(SPILL_DIR)})
+    try:
+        if source is not None:
+            source = Path(source)
+            ext = source.suffix.lower()
+            if source.is_dir():  # partitioned Parquet, read the same way as everywhere else in the app
+                _create_view(conn, SOURCE_VIEW, open_dataset(source))
+            elif ext in SQLITE_EXTS:
+                try:
+                    conn.execute(f"ATTACH {_literal(source.as_posix())} AS db (TYPE sqlite, READ_ONLY)")
+                    if sqlite_table:
+                        _create_view(conn, SOURCE_VIEW, f"db.{quote_ident(sqlite_table)}")
+                except duckdb.Error:
+                    # sqlite extension not installed and not downloadable (offline): read the table once instead.
+                    if sqlite_table:
+                        with sqlite3.connect(f"file:{source.as_posix()}?mode=ro", uri=True) as db:
+                            _create_view(conn, SOURCE_VIEW, pd.read_sql_query(
+                                f"SELECT * FROM {quote_ident(sqlite_table)}", db))
+            elif ext in QUERY_EXTS:
+                _create_view(conn, SOURCE_VIEW, _scan([source]))
+        if pattern.strip():
+            files = glob_files(root or Path.cwd(), pattern.strip())
+            if not files:
+                raise ValueError(f"No data files match {pattern!r}")
+            _create_view(conn, GLOB_VIEW, _scan(files))
+        yield conn
+    finally:
+        conn.close()
+
+
+def _subquery(sql: str) -> str:
+    sql = sql.strip().rstrip(";").strip()
+    if not sql:
+        raise ValueError("Enter a query.")
+    return f"({sql}) AS q"
+
+
+def count_rows(sql: str, **sources) -> int:
+    with query_connection(**sources) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {_subquery(sql)}").fetchone()[0]
+
+
+def query_page(sql: str, page_no: int, page_size: int, **sources) -> pd.DataFrame:
+    """One page of the query result; DuckDB stops producing rows once the page is full."""
+    with query_connection(**sources) as conn:
+        df = conn.execute(f"SELECT * FROM {_subquery(sql)} LIMIT ? OFFSET ?",
+                          [page_size, page_no * page_size]).df()
+    df.index = pd.RangeIndex(page_no * page_size, page_no * page_size + len(df))
+    return df
+
+
+def export_query(sql: str, out: Path, fmt: str, **sources) -> int:
+    """Stream the full result to out with DuckDB's COPY (no pandas round trip); returns rows written."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Query results export as {', '.join(EXPORT_FORMATS)} only")
+    with query_connection(**sources) as conn, atomic_write(Path(out)) as tmp:
+        row = conn.execute(f"COPY (SELECT * FROM {_subquery(sql)}) TO {_literal(tmp.as_posix())} "
+                           f"{EXPORT_FORMATS[fmt]}").fetchone()
+    return row[0] if row else 0
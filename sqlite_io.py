@@ -0,0 +1,266 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, Sequence
+
+import pandas as pd
+
+SQLITE_EXTS = {".db", ".sqlite", ".sqlite3"}
+SQLITE_MODES = ["replace", "append", "upsert"]
+# Rows per executemany call; large batches keep the per-statement overhead negligible.
+BATCH_ROWS = 50_000
+# Set on the loading connection: WAL lets readers continue during the load, NORMAL drops the
+# fsync per commit (still crash-safe under WAL), 64 MiB page cache. bulk_connection puts the
+# file's own journal mode back afterwards.
+LOAD_PRAGMAS = ("PRAGMA journal_mode=WAL", "PRAGMA synchronous=NORMAL", "PRAGMA cache_size=-65536",
+                "PRAGMA temp_store=MEMORY")
+
+
+def quote_ident(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def sql_value(v):
+    """One Python value sqlite3 can bind: NaN/NaT/NA -> None, Timestamp -> ISO text, numpy scalar -> Python."""
+    if v is None or (not isinstance(v, (list, dict)) and pd.isna(v)):
+        return None
+    if isinstance(v, pd.Timestamp):
+        return v.isoformat(sep=" ")
+    return v.item() if hasattr(v, "item") else v
+
+
+def _sqlite_type(dtype) -> str:
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "TIMESTAMP"
+    return "TEXT"
+
+
+def _column_values(s: pd.Series) -> list:
+    """A column as bindable Python values, converted once per column rather than once per cell."""
+    if pd.api.types.is_datetime64_any_dtype(s.dtype):
+        return s.astype(str).where(s.notna(), None).tolist()
+    values = s.astype(object).where(s.notna(), None).tolist()
+    if s.dtype == object:
+        values = [sql_value(v) for v in values]  # numpy scalars / Timestamps hiding in object columns
+    return values
+
+
+def iter_row_batches(df: pd.DataFrame, batch_rows: int = BATCH_ROWS) -> Iterator[list[tuple]]:
+    for start in range(0, len(df), batch_rows):
+        part = df.iloc[start:start + batch_rows]
+        yield list(zip(*(_column_values(part[c]) for c in part.columns)))
+
+
+@contextmanager
+def bulk_connection(db_file: Path) -> Iterator[sqlite3.Connection]:
+    """Connection with load pragmas inside one BEGIN IMMEDIATE ... COMMIT (rolled back on error)."""
+    conn = sqlite3.connect(db_file, timeout=30, isolation_level=None)
+    try:
+        journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        for pragma in LOAD_PRAGMAS:
+            conn.execute(pragma)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            conn.execute("PRAGMA optimize")
+        finally:
+            if journal_mode.lower() != "wal":
+                try:
+                    conn.execute(f"PRAGMA journal_mode={journal_mode}")
+                except sqlite3.OperationalError:
+                    pass  # another connection still has the file open; it stays in WAL until the next load
+    finally:
+        conn.close()
+
+
+def _index_name(table: str, cols: Sequence[str], unique: bool) -> str:
+    return ("ux_" if unique else "ix_") + "_".join([table, *cols])
+
+
+def _create_index(conn: sqlite3.Connection, table: str, cols: Sequence[str], unique: bool = False) -> None:
+    conn.execute(f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS "
+                 f"{quote_ident(_index_name(table, cols, unique))} ON {quote_ident(table)} "
+                 f"({', '.join(quote_ident(c) for c in cols)})")
+
+
+def _has_unique(conn: sqlite3.Connection, table: str, cols: Sequence[str]) -> bool:
+    """True when the primary key or a (non-partial) unique index of table is exactly cols."""
+    tbl, want = quote_ident(table), set(cols)
+    if {r[1] for r in conn.execute(f"PRAGMA table_info({tbl})") if r[5]} == want:
+        return True
+    for _, name, unique, _, partial in conn.execute(f"PRAGMA index_list({tbl})"):
+        if unique and not partial and {r[2] for r in conn.execute(
+                f"PRAGMA index_info({quote_ident(name)})")} == want:
+            return True
+    return False
+
+
+def write_sqlite(df: pd.DataFrame, db_file: Path, table: str, mode: str = "replace",
+                 key: Sequence[str] | None = None, indexes: Iterable[str | Sequence[str]] = (),
+                 batch_rows: int = BATCH_ROWS) -> dict:
+    """
+    Bulk-load df into a SQLite table in one transaction; returns rows, seconds and rows_per_sec.
+
+    mode "replace" drops and recreates the table, "append" inserts (creating the
+    table if needed) and "upsert" inserts or, for rows whose key already exists,
+    updates the other columns (INSERT ... ON CONFLICT; needs SQLite 3.24+). Rows
+    go in batch_rows at a time through executemany. The unique index on `key`
+    and any `indexes` are built after the load - one sort instead of per-row
+    index maintenance - except that upsert needs its key index up front. A key
+    the table's primary key or an existing unique index already covers gets no
+    second index.
+    """
+    if mode not in SQLITE_MODES:
+        raise ValueError(f"Unknown SQLite mode: {mode!r} (choose from {', '.join(SQLITE_MODES)})")
+    key = list(key or [])
+    if mode == "upsert" and not key:
+        raise ValueError("Upsert needs key column(s) to match existing rows on.")
+    missing = [c for c in key if c not in df.columns]
+    if missing:
+        raise ValueError(f"Key column(s) not in the data: {', '.join(missing)}")
+
+    start = time.perf_counter()
+    tbl, cols = quote_ident(table), [str(c) for c in df.columns]
+    col_list = ", ".join(quote_ident(c) for c in cols)
+    with bulk_connection(db_file) as conn:
+        if mode == "replace":
+            conn.execute(f"DROP TABLE IF EXISTS {tbl}")
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {tbl} ("
+                     + ", ".join(f"{quote_ident(c)} {_sqlite_type(t)}" for c, t in zip(cols, df.dtypes)) + ")")
+        sql = f"INSERT INTO {tbl} ({col_list}) VALUES ({', '.join('?' for _ in cols)})"
+        key_indexed = bool(key) and _has_unique(conn, table, key)
+        if mode == "upsert":
+            if not key_indexed:
+                _create_index(conn, table, key, unique=True)  # ON CONFLICT needs it to exist
+                key_indexed = True
+            others = [c for c in cols if c not in key]
+            sql += (f" ON CONFLICT ({', '.join(quote_ident(c) for c in key)}) DO "
+                    + ("UPDATE SET " + ", ".join(f"{quote_ident(c)} = excluded.{quote_ident(c)}" for c in others)
+                       if others else "NOTHING"))
+        for batch in iter_row_batches(df, batch_rows):
+            conn.executemany(sql, batch)
+        if key and not key_indexed:
+            _create_index(conn, table, key, unique=True)
+        for index in indexes:
+            _create_index(conn, table, [index] if isinstance(index, str) else list(index))
+    seconds = time.perf_counter() - start
+    return {"rows": len(df), "seconds": seconds, "rows_per_sec": len(df) / max(seconds, 1e-9)}
+
+
+def _connect_ro(db_file: Path, **kwargs) -> sqlite3.Connection:
+    return sqlite3.connect(f"file:{Path(db_file).as_posix()}?mode=ro", uri=True, **kwargs)
+
+
+def sqlite_tables(p: Path) -> list[str]:
+    with _connect_ro(p) as conn:
+        return [r[0] for r in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name")]
+
+
+def db_signature(p: Path) -> tuple[int, int, int]:
+    """Changes whenever the database does: in WAL mode commits land in <db>-wal, not the main file."""
+    p = Path(p)
+    try:
+        wal = os.stat(f"{p}-wal")
+        wal_sig = (wal.st_size, wal.st_mtime_ns)
+    except OSError:
+        wal_sig = (0, 0)
+    return (p.stat().st_mtime_ns, *wal_sig)
+
+
+class SqliteTable:
+    """
+    Lazy, page-addressable view of one SQLite table.
+
+    Pages are read with keyset pagination on the rowid (or the primary key of a
+    WITHOUT ROWID table): a page is one index seek plus page_size rows however
+    deep into the table it sits, and the first key of every page reached is
+    remembered so stepping back and forth never rescans. Columns come from the
+    table's schema and num_rows from COUNT(*); nothing else is read until a page
+    is asked for. Page frames are indexed by key, so an EditDelta of a page
+    maps straight onto targeted UPDATE/DELETE statements.
+    """
+
+    def __init__(self, p: Path, table: str):
+        self.path, self.table = Path(p), table
+        self._tbl = quote_ident(table)
+        # Cached across reruns and sessions; the lock serializes use of the shared connection.
+        self._conn = _connect_ro(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        info = self._conn.execute(f"PRAGMA table_info({self._tbl})").fetchall()
+        if not info:
+            self._conn.close()
+            raise ValueError(f"No table {table!r} in {self.path.name}")
+        self.columns = [r[1] for r in info]
+        pk = [r[1] for r in sorted(info, key=lambda r: r[5]) if r[5]]
+        try:
+            self._conn.execute(f"SELECT rowid FROM {self._tbl} LIMIT 0")
+            self.key = "rowid"
+            # An INTEGER PRIMARY KEY is the rowid under another name: show it once, as the row label.
+            alias = len(pk) == 1 and next(r[2] for r in info if r[1] == pk[0]).upper() == "INTEGER"
+            self.index_name = pk[0] if alias else "rowid"
+        except sqlite3.OperationalError:  # WITHOUT ROWID
+            self.key = self.index_name = pk[0] if len(pk) == 1 else None
+        self.num_rows = self._conn.execute(f"SELECT COUNT(*) FROM {self._tbl}").fetchone()[0]
+        self._starts: dict[int, list] = {}
+
+    @property
+    def editable(self) -> bool:
+        """False for composite-key WITHOUT ROWID tables, which are paged by OFFSET and have no single row key."""
+        return self.key is not None
+
+    def _key_sql(self) -> str:
+        return "rowid" if self.key == "rowid" else quote_ident(self.key)
+
+    def _page_start(self, page_no: int, page_size: int):
+        """First key of the page, hopping page_size keys at a time from the nearest page already reached."""
+        key = self._key_sql()
+        starts = self._starts.setdefault(page_size, [])
+        if not starts:
+            first = self._conn.execute(f"SELECT MIN({key}) FROM {self._tbl}").fetchone()[0]
+            if first is None:
+                return None
+            starts.append(first)
+        while len(starts) <= page_no:
+            row = self._conn.execute(f"SELECT {key} FROM {self._tbl} WHERE {key} >= ? ORDER BY {key} "
+                                     f"LIMIT 1 OFFSET ?", (starts[-1], page_size)).fetchone()
+            if row is None:
+                return None
+            starts.append(row[0])
+        return starts[page_no]
+
+    def page(self, page_no: int, page_size: int) -> pd.DataFrame:
+        with self._lock:
+            if self.key is None:
+                offset = page_no * page_size
+                df = pd.read_sql_query(f"SELECT * FROM {self._tbl} LIMIT ? OFFSET ?", self._conn,
+                                       params=(page_size, offset))
+                df.index = pd.RangeIndex(offset, offset + len(df), name="row")
+                return df
+            start = self._page_start(page_no, page_size)
+            if start is None:
+                return pd.DataFrame(columns=[c for c in self.columns if c != self.index_name])
+            key = self._key_sql()
+            df = pd.read_sql_query(f"SELECT {key} AS __key, * FROM {self._tbl} WHERE {key} >= ? "
+                                   f"ORDER BY {key} LIMIT ?", self._conn, params=(start, page_size))
+        df = df.set_index("__key").drop(columns=[self.index_name], errors="ignore")
+        df.index.name = self.index_name
+        return df
+
+    def num_pages(self, page_size: int) -> int:
+        return max(1, -(-self.num_rows // page_size))
+
+    def close(self) -> None:
+        self._conn.close()